@@ -3,4 +3,7 @@ from django.apps import AppConfig
 
 class ClientsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'clients'
\ No newline at end of file
+    name = 'clients'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,114 @@
+"""
+Client identity: one row per normalized phone number.
+
+``upsert_client`` is race free - the insert is ``ON CONFLICT DO NOTHING`` on
+PostgreSQL and ``INSERT OR IGNORE`` on SQLite, so concurrent submissions for
+the same number never create a second client or fail with an IntegrityError.
+"""
+from collections import defaultdict
+
+from django.conf import settings
+from django.db.models import Q
+
+from .phone import InvalidPhoneNumber, normalize_phone
+from .search import index_clients
+
+
+def upsert_client(phone_number, full_name, email=''):
+    """Return the client for ``phone_number``, creating it if needed"""
+    from .models import Client
+
+    from core import stats
+
+    phone_number = normalize_phone(phone_number)
+    candidate = Client(phone_number=phone_number, full_name=full_name, email=email or None)
+    Client.objects.bulk_create([candidate], ignore_conflicts=True)
+    client = Client.objects.get(phone_number=phone_number)
+    if client.created_at == candidate.created_at:
+        # Our insert won (bulk_create stamped the candidate) - no signals fire for it
+        stats.record(stats.day_of(client.created_at), clients=1)
+        index_clients([client.pk])
+    if email and not client.email:
+        # Fill in what earlier submissions left out, never overwrite
+        Client.objects.filter(Q(email__isnull=True) | Q(email=''), pk=client.pk).update(email=email)
+        client.email = email
+    return client
+
+
+def merge_duplicates(Client, dry_run=False):
+    """
+    Normalize every stored number and fold clients that share one into the
+    oldest of them. Rows pointing at a duplicate (quote requests and any
+    other foreign key to Client) are re-pointed with one UPDATE per relation.
+
+    ``Client`` is passed in so migrations can use their historical model.
+    Returns (clients merged away, numbers that could not be normalized).
+    """
+    groups = defaultdict(list)
+    invalid = set()
+    rows = Client.objects.order_by('created_at', 'id').values_list('id', 'phone_number')
+    for client_id, phone_number in rows:
+        try:
+            groups[normalize_phone(phone_number)].append((client_id, phone_number))
+        except InvalidPhoneNumber:
+            # Left as entered, but exact repeats are still folded
+            groups[phone_number].append((client_id, phone_number))
+            invalid.add(phone_number)
+
+    relations = [
+        relation for relation in Client._meta.related_objects
+        if relation.one_to_many or relation.one_to_one
+    ]
+    merged = 0
+    for phone_number, members in groups.items():
+        keeper_id, keeper_phone = members[0]
+        duplicate_ids = [client_id for client_id, _ in members[1:]]
+        merged += len(duplicate_ids)
+        if dry_run:
+            continue
+        if duplicate_ids:
+            keeper = Client.objects.get(pk=keeper_id)
+            if not keeper.email:
+                keeper.email = Client.objects.filter(
+                    pk__in=duplicate_ids, email__gt=''
+                ).values_list('email', flat=True).first()
+            for relation in relations:
+                relation.related_model._base_manager.filter(
+                    **{f'{relation.field.name}__in': duplicate_ids}
+                ).update(**{relation.field.name: keeper_id})
+            Client.objects.filter(pk__in=duplicate_ids).delete()
+            Client.objects.filter(pk=keeper_id).update(phone_number=phone_number, email=keeper.email)
+        elif keeper_phone != phone_number:
+            Client.objects.filter(pk=keeper_id).update(phone_number=phone_number)
+    return merged, sorted(invalid)
+
+
+# Lets a device that submitted a quote see its own details pre-filled next time
+RETURNING_CLIENT_COOKIE = 'tecky_client'
+RETURNING_CLIENT_SALT = 'clients.returning-client'
+RETURNING_CLIENT_MAX_AGE = 60 * 60 * 24 * 365
+
+
+def remember_client(response, client):
+    response.set_signed_cookie(
+        RETURNING_CLIENT_COOKIE,
+        str(client.pk),
+        salt=RETURNING_CLIENT_SALT,
+        max_age=RETURNING_CLIENT_MAX_AGE,
+        httponly=True,
+        samesite='Lax',
+        secure=settings.SESSION_COOKIE_SECURE,
+    )
+    return response
+
+
+def returning_client(request):
+    """The client this device submitted as before, or None"""
+    from .models import Client
+
+    client_id = request.get_signed_cookie(
+        RETURNING_CLIENT_COOKIE, default=None, salt=RETURNING_CLIENT_SALT, max_age=RETURNING_CLIENT_MAX_AGE
+    )
+    if not client_id or not client_id.isdigit():
+        return None
+    return Client.objects.filter(pk=client_id).first()
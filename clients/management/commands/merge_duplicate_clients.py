@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from clients.identity import merge_duplicates
+from clients.models import Client
+
+
+class Command(BaseCommand):
+    help = (
+        'Normalize client phone numbers to E.164 and merge clients that share a number '
+        'into the oldest one, moving their quote requests across'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Report without changing anything')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            merged, invalid = merge_duplicates(Client, dry_run=options['dry_run'])
+
+        for phone_number in invalid:
+            self.stdout.write(self.style.WARNING(f'Could not normalize {phone_number!r}, left as is'))
+        verb = 'would be merged' if options['dry_run'] else 'merged'
+        self.stdout.write(self.style.SUCCESS(f'{merged} duplicate clients {verb}'))
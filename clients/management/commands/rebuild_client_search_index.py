@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from clients.models import Client
+from clients.search import rebuild_index
+from core.fts import search_backend
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the client search index used by the dashboard'
+
+    def handle(self, *args, **options):
+        backend = search_backend()
+        if backend is None:
+            self.stdout.write('No full-text search support on this database, nothing to do')
+            return
+
+        rebuild_index()
+        self.stdout.write(
+            self.style.SUCCESS(f'Indexed {Client.objects.count()} clients ({backend})')
+        )
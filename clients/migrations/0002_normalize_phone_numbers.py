@@ -0,0 +1,94 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:28
+
+import re
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+# Frozen copies of clients.phone.normalize_phone and clients.identity.merge_duplicates
+# as they were when this migration was written
+
+_SEPARATORS_RE = re.compile(r'[\s\-().\/]')
+NATIONAL_NUMBER_LENGTH = 9
+
+
+def normalize_phone(value):
+    """``value`` in E.164 form, or None if it isn't a recognised number"""
+    country_code = settings.DEFAULT_PHONE_COUNTRY_CODE
+    number = _SEPARATORS_RE.sub('', value or '')
+    if number.startswith('00'):
+        number = '+' + number[2:]
+
+    if number.startswith('+'):
+        digits = number[1:]
+    elif number.startswith('0') and len(number) == NATIONAL_NUMBER_LENGTH + 1:
+        digits = country_code + number[1:]
+    elif len(number) == NATIONAL_NUMBER_LENGTH:
+        digits = country_code + number
+    elif number.startswith(country_code):
+        digits = number
+    else:
+        return None
+
+    if digits.startswith(country_code + '0') and len(digits) == len(country_code) + NATIONAL_NUMBER_LENGTH + 1:
+        digits = country_code + digits[len(country_code) + 1:]
+
+    if not digits.isdigit() or not 8 <= len(digits) <= 15 or digits.startswith('0'):
+        return None
+    return '+' + digits
+
+
+def normalize_and_merge(apps, schema_editor):
+    """
+    E.164 numbers, one client per number - required by the unique index in
+    0003. Clients sharing a number are folded into the oldest of them.
+    """
+    Client = apps.get_model('clients', 'Client')
+
+    groups = defaultdict(list)
+    rows = Client.objects.order_by('created_at', 'id').values_list('id', 'phone_number')
+    for client_id, phone_number in rows:
+        # Unrecognised numbers are left as entered, but exact repeats are still folded
+        groups[normalize_phone(phone_number) or phone_number].append((client_id, phone_number))
+
+    relations = [
+        relation for relation in Client._meta.related_objects
+        if relation.one_to_many or relation.one_to_one
+    ]
+    for phone_number, members in groups.items():
+        keeper_id, keeper_phone = members[0]
+        duplicate_ids = [client_id for client_id, _ in members[1:]]
+        if duplicate_ids:
+            keeper = Client.objects.get(pk=keeper_id)
+            if not keeper.email:
+                keeper.email = Client.objects.filter(
+                    pk__in=duplicate_ids, email__gt=''
+                ).values_list('email', flat=True).first()
+            for relation in relations:
+                relation.related_model._base_manager.filter(
+                    **{f'{relation.field.name}__in': duplicate_ids}
+                ).update(**{relation.field.name: keeper_id})
+            Client.objects.filter(pk__in=duplicate_ids).delete()
+            Client.objects.filter(pk=keeper_id).update(phone_number=phone_number, email=keeper.email)
+        elif keeper_phone != phone_number:
+            Client.objects.filter(pk=keeper_id).update(phone_number=phone_number)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0001_initial'),
+        # Quote requests are re-pointed from merged clients
+        ('quotes', '0002_reference_image_job'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='client',
+            name='phone_number',
+            field=models.CharField(max_length=16),
+        ),
+        migrations.RunPython(normalize_and_merge, migrations.RunPython.noop),
+    ]
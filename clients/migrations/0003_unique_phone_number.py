@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0002_normalize_phone_numbers'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='client',
+            name='phone_number',
+            field=models.CharField(max_length=16, unique=True),
+        ),
+    ]
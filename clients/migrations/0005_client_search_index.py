@@ -0,0 +1,56 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:40
+
+from django.db import migrations, models
+
+
+PG_DOCUMENT_SQL = (
+    "to_tsvector('simple', coalesce(full_name, '') || ' ' || translate(coalesce(email, ''), '@.', '  '))"
+)
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        schema_editor.execute(
+            f'CREATE INDEX clients_client_search_idx ON clients_client USING GIN (({PG_DOCUMENT_SQL}))'
+        )
+    elif connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+            if not cursor.fetchone()[0]:
+                return
+        schema_editor.execute(
+            """
+            CREATE VIRTUAL TABLE IF NOT EXISTS clients_client_fts
+            USING fts5(full_name, email, tokenize='unicode61', prefix='2 3')
+            """
+        )
+        schema_editor.execute(
+            """
+            INSERT INTO clients_client_fts (rowid, full_name, email)
+            SELECT id, full_name, coalesce(email, '') FROM clients_client
+            """
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS clients_client_search_idx')
+    elif connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS clients_client_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0004_created_at_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(fields=['phone_number'], name='client_phone_prefix_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:20
+
+from django.db import DatabaseError, migrations, transaction
+
+
+def create_phone_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+    try:
+        with transaction.atomic(using=connection.alias):
+            schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    except DatabaseError:
+        # Needs a privileged role; digits inside a number are then matched unindexed
+        return
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS clients_client_phone_trgm_idx '
+        'ON clients_client USING GIN (phone_number gin_trgm_ops)'
+    )
+
+
+def drop_phone_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS clients_client_phone_trgm_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0005_client_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_phone_index, drop_phone_index),
+    ]
@@ -1,15 +1,39 @@
+from django.core.exceptions import ValidationError
 from django.db import models
 
+from .phone import InvalidPhoneNumber, normalize_phone
+
 
 class Client(models.Model):
     full_name = models.CharField(max_length=200)
-    phone_number = models.CharField(max_length=15)
+    # E.164 (+254723835202), the client's identity - see clients.identity
+    phone_number = models.CharField(max_length=16, unique=True)
     email = models.EmailField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Date-range scans for the dashboard analytics
+            models.Index(fields=['created_at'], name='client_created_idx'),
+            # Phone prefix search (LIKE '+2547%'); see clients.search
+            models.Index(fields=['phone_number'], name='client_phone_prefix_idx', opclasses=['varchar_pattern_ops']),
+        ]
     
     def __str__(self):
-        return f"{self.full_name} - {self.phone_number}"
\ No newline at end of file
+        return f"{self.full_name} - {self.phone_number}"
+    
+    def clean(self):
+        try:
+            self.phone_number = normalize_phone(self.phone_number)
+        except InvalidPhoneNumber:
+            raise ValidationError({'phone_number': 'Enter a valid phone number, e.g. 0723835202.'})
+    
+    def save(self, *args, **kwargs):
+        try:
+            self.phone_number = normalize_phone(self.phone_number)
+        except InvalidPhoneNumber:
+            # Kept as entered; manage.py merge_duplicate_clients reports these
+            pass
+        super().save(*args, **kwargs)
\ No newline at end of file
@@ -0,0 +1,93 @@
+"""
+Phone number normalization to E.164 (``+254723835202``).
+
+Clients are identified by phone number, so every spelling of a number -
+``0723 835 202``, ``254723835202``, ``+254-723-835-202`` - must map to the
+same stored value. Numbers without a country code are taken to be local to
+``settings.DEFAULT_PHONE_COUNTRY_CODE`` (Kenya).
+"""
+import re
+
+from django.conf import settings
+
+
+class InvalidPhoneNumber(ValueError):
+    pass
+
+
+_SEPARATORS_RE = re.compile(r'[\s\-().\/]')
+
+# Kenyan subscriber numbers are 9 digits after the trunk prefix 0
+NATIONAL_NUMBER_LENGTH = 9
+
+
+def normalize_phone(value, country_code=None):
+    """Return ``value`` in E.164 form, or raise InvalidPhoneNumber"""
+    country_code = country_code or settings.DEFAULT_PHONE_COUNTRY_CODE
+    number = _SEPARATORS_RE.sub('', value or '')
+    if number.startswith('00'):
+        number = '+' + number[2:]
+
+    if number.startswith('+'):
+        digits = number[1:]
+    elif number.startswith('0') and len(number) == NATIONAL_NUMBER_LENGTH + 1:
+        digits = country_code + number[1:]
+    elif len(number) == NATIONAL_NUMBER_LENGTH:
+        digits = country_code + number
+    elif number.startswith(country_code):
+        digits = number
+    else:
+        raise InvalidPhoneNumber(f'{value!r} is not a recognised phone number')
+
+    # The local trunk 0 is sometimes kept after the country code (+2540723...)
+    if digits.startswith(country_code + '0') and len(digits) == len(country_code) + NATIONAL_NUMBER_LENGTH + 1:
+        digits = country_code + digits[len(country_code) + 1:]
+
+    if not digits.isdigit() or not 8 <= len(digits) <= 15 or digits.startswith('0'):
+        raise InvalidPhoneNumber(f'{value!r} is not a recognised phone number')
+    return '+' + digits
+
+
+def _number_like(query):
+    """``query`` without separators, with ``00`` spelled ``+``, or None"""
+    number = _SEPARATORS_RE.sub('', query or '')
+    if number.startswith('00'):
+        number = '+' + number[2:]
+    digits = number.lstrip('+')
+    if not digits.isdigit() or len(digits) < 3:
+        return None
+    return number
+
+
+def search_prefix(query):
+    """
+    The E.164 start of a partial number, for prefix lookups on the phone
+    index: ``0723 835`` -> ``+254723835``, ``+2547`` -> ``+2547``. Returns
+    None unless ``query`` is number-like and reads as the start of a number
+    (``+``, the trunk ``0`` or the country code).
+    """
+    number = _number_like(query)
+    if number is None:
+        return None
+    digits = number.lstrip('+')
+    country_code = settings.DEFAULT_PHONE_COUNTRY_CODE
+    if number.startswith('+'):
+        return '+' + digits
+    if digits.startswith('0'):
+        return '+' + country_code + digits[1:]
+    if digits.startswith(country_code) and len(digits) > len(country_code) + 3:
+        national = digits[len(country_code):]
+        return '+' + country_code + (national[1:] if national.startswith('0') else national)
+    return None
+
+
+def search_digits(query):
+    """
+    The digits of a number-like query typed without ``+``, to be matched
+    anywhere in a number - ``835202`` is as likely the tail of a number as
+    its start. Returns None for other queries.
+    """
+    number = _number_like(query)
+    if number is None or number.startswith('+'):
+        return None
+    return number
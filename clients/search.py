@@ -0,0 +1,99 @@
+"""
+Indexed client search for the staff dashboard.
+
+Number-like queries match phone numbers (``phone_condition``). One that reads
+as the start of a number becomes an E.164 prefix (``clients.phone.search_prefix``)
+matched with ``LIKE 'prefix%'`` against ``client_phone_prefix_idx``; digits
+typed without ``+``, such as the last few of a number, also match anywhere in
+it, through the trigram index ``clients_client_phone_trgm_idx`` on PostgreSQL
+(migration ``0006_client_phone_trigram_index``, when ``pg_trgm`` can be
+installed) and by a scan of the narrow phone column elsewhere. Anything else is matched word
+by word, as prefixes, against name and email:
+
+* PostgreSQL - a GIN expression index over ``to_tsvector('simple', ...)``
+  of both columns. It is computed by the database, so bulk inserts need no
+  upkeep.
+* SQLite - an FTS5 table ``clients_client_fts``, kept current by the
+  handlers in ``clients.signals`` and by ``upsert_client``.
+
+Both are created by migration ``0005_client_search_index``.
+"""
+from django.db.models import Q
+
+from core.fts import Fts5Table, search_backend, search_terms, tsquery
+
+from .phone import search_digits, search_prefix
+
+
+FTS_TABLE = 'clients_client_fts'
+
+# Must stay identical to the indexed expression in the migration
+PG_DOCUMENT_SQL = (
+    "to_tsvector('simple', coalesce(full_name, '') || ' ' || translate(coalesce(email, ''), '@.', '  '))"
+)
+
+
+FTS = Fts5Table(
+    FTS_TABLE,
+    ['full_name', 'email'],
+    "SELECT id, full_name, coalesce(email, '') FROM clients_client",
+    'id',
+)
+
+
+def index_clients(client_ids):
+    """(Re)index the given clients (only SQLite keeps a separate index)"""
+    FTS.index(client_ids)
+
+
+def unindex_client(client_id):
+    FTS.unindex(client_id)
+
+
+def rebuild_index():
+    """Index every client from scratch (the PostgreSQL index needs no rebuild)"""
+    FTS.rebuild()
+
+
+def phone_condition(query, field='phone_number'):
+    """A Q matching ``field`` against a number-like ``query``, or None"""
+    condition = Q()
+    prefix = search_prefix(query)
+    if prefix:
+        condition |= Q(**{f'{field}__startswith': prefix})
+    digits = search_digits(query)
+    if digits:
+        condition |= Q(**{f'{field}__contains': digits})
+    return condition or None
+
+
+def search_clients(query, queryset=None):
+    """Return ``queryset`` narrowed to clients whose number, name or email matches ``query``"""
+    from .models import Client
+
+    if queryset is None:
+        queryset = Client.objects.all()
+
+    by_phone = phone_condition(query)
+    if by_phone:
+        return queryset.filter(by_phone)
+
+    terms = search_terms(query)
+    if not terms:
+        return queryset.none()
+
+    backend = search_backend()
+    if backend == 'postgresql':
+        return queryset.extra(
+            where=[f"{PG_DOCUMENT_SQL} @@ to_tsquery('simple', %s)"],
+            params=[tsquery(terms)],
+        )
+
+    if backend == 'sqlite':
+        return queryset.filter(id__in=FTS.matching(terms))
+
+    # No full-text support on this database - plain substring match
+    condition = Q()
+    for term in terms:
+        condition &= Q(full_name__icontains=term) | Q(email__icontains=term)
+    return queryset.filter(condition)
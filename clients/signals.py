@@ -0,0 +1,18 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Client
+from .search import index_clients, unindex_client
+
+
+@receiver(post_save, sender=Client)
+def index_client(sender, instance, raw=False, **kwargs):
+    """Keep the search index in step with the client"""
+    if raw:
+        return
+    index_clients([instance.pk])
+
+
+@receiver(post_delete, sender=Client)
+def unindex_deleted_client(sender, instance, **kwargs):
+    unindex_client(instance.pk)
@@ -1,4 +1,19 @@
 from django.contrib import admin
+from django.utils import timezone
+from .models import OutboxMessage
 
-# Core app admin configuration
-# No models to register in core app
\ No newline at end of file
+
+@admin.register(OutboxMessage)
+class OutboxMessageAdmin(admin.ModelAdmin):
+    list_display = ['subject', 'kind', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at']
+    list_filter = ['status', 'kind']
+    search_fields = ['subject', 'recipients']
+    readonly_fields = ['claim', 'claimed_at', 'created_at', 'sent_at', 'last_error']
+    actions = ['retry_now']
+    
+    def retry_now(self, request, queryset):
+        updated = queryset.exclude(status='sent').update(
+            status='pending', attempts=0, next_attempt_at=timezone.now(), claim=None
+        )
+        self.message_user(request, f'{updated} messages queued for another try')
+    retry_now.short_description = "Retry selected messages now"
@@ -8,10 +8,14 @@ app_name = 'dashboard'
 urlpatterns = [
     path('', admin_views.admin_dashboard, name='dashboard'),
     path('clients/', admin_views.admin_clients, name='clients'),
+    path('clients/export/', admin_views.admin_export_clients, name='export_clients'),
     path('products/', admin_views.admin_products, name='products'),
     path('quotes/', admin_views.admin_quotes, name='quotes'),
+    path('quotes/export/', admin_views.admin_export_quotes, name='export_quotes'),
+    path('quotes/bulk-status/', admin_views.admin_quotes_bulk_status, name='quotes_bulk_status'),
     path('quotes/<int:quote_id>/', admin_views.admin_quote_detail, name='quote_detail'),
     path('api/analytics/', admin_views.admin_analytics_api, name='analytics_api'),
+    path('api/live/quotes/', admin_views.admin_live_quotes, name='live_quotes'),
     path('login/', AdminLoginView.as_view(), name='login'),
     path('logout/', LogoutView.as_view(next_page='/'), name='logout'),
 ]
\ No newline at end of file
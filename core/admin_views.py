@@ -1,15 +1,31 @@
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, get_object_or_404, redirect
+from django.urls import reverse
+from django.views.decorators.http import require_POST
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib import messages
-from django.db.models import Count, Q
+from django.db.models import Count, Max, Q, Sum
+from django.db.models.functions import TruncMonth
 from django.utils import timezone
 from datetime import datetime, timedelta
-from django.http import JsonResponse
-from django.core.paginator import Paginator
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
 
 from clients.models import Client
+from clients.search import search_clients
+from products.counts import totals
 from products.models import Product, Category
-from quotes.models import QuoteRequest, Measurements
+from products.search import search_products
+from . import funnel
+from .analytics import GRANULARITIES, analytics
+from .cache import ANALYTICS, CATALOG, page_cache_stats
+from .exports import FORMATS, stream_export
+from .live import InvalidCursor, changes_since, current_cursor, decode_cursor, event_stream
+from .models import DailyStats
+from .pagination import EstimatedCountPaginator
+from quotes.models import QuoteRequest, Measurements, ReferenceImageJob
+from quotes.search import search_quotes
+from quotes.status import bulk_transition, set_status
 
 
 @staff_member_required
@@ -17,19 +33,35 @@ def admin_dashboard(request):
     """Modern admin dashboard with statistics and recent activity"""
     
     # Get date ranges
-    today = timezone.now().date()
+    today = timezone.localdate()
     week_ago = today - timedelta(days=7)
     month_ago = today - timedelta(days=30)
     
+    # Product totals come from the denormalized category counts
+    catalog = Category.objects.aggregate(products=Sum('product_count'), featured=Sum('featured_count'))
+    
+    # Quote totals by current status in one pass
+    quote_counts = QuoteRequest.objects.aggregate(
+        total=Count('id'),
+        **{status: Count('id', filter=Q(status=status)) for status, _ in QuoteRequest.STATUS_CHOICES}
+    )
+    
+    # New clients and quotes per day come from the DailyStats rollup
+    rollup = DailyStats.objects.aggregate(
+        total_clients=Sum('clients'),
+        new_clients_this_week=Sum('clients', filter=Q(date__gte=week_ago)),
+        quotes_this_month=Sum('quotes', filter=Q(date__gte=month_ago)),
+    )
+    
     # Statistics
     stats = {
-        'total_clients': Client.objects.count(),
-        'new_clients_this_week': Client.objects.filter(created_at__date__gte=week_ago).count(),
-        'total_products': Product.objects.count(),
-        'featured_products': Product.objects.filter(is_featured=True).count(),
-        'total_quotes': QuoteRequest.objects.count(),
-        'pending_quotes': QuoteRequest.objects.filter(status='pending').count(),
-        'quotes_this_month': QuoteRequest.objects.filter(created_at__date__gte=month_ago).count(),
+        'total_clients': rollup['total_clients'] or 0,
+        'new_clients_this_week': rollup['new_clients_this_week'] or 0,
+        'total_products': catalog['products'] or 0,
+        'featured_products': catalog['featured'] or 0,
+        'total_quotes': quote_counts['total'],
+        'pending_quotes': quote_counts['pending'],
+        'quotes_this_month': rollup['quotes_this_month'] or 0,
     }
     
     # Recent activity
@@ -38,64 +70,82 @@ def admin_dashboard(request):
     recent_products = Product.objects.select_related('category').order_by('-created_at')[:5]
     
     # Quote status distribution
-    quote_status_data = QuoteRequest.objects.values('status').annotate(count=Count('id'))
-    
-    # Monthly quote trends (last 6 months)
-    monthly_quotes = []
-    for i in range(6):
-        month_start = today.replace(day=1) - timedelta(days=i*30)
-        month_end = month_start + timedelta(days=30)
-        count = QuoteRequest.objects.filter(
-            created_at__date__gte=month_start,
-            created_at__date__lt=month_end
-        ).count()
-        monthly_quotes.append({
-            'month': month_start.strftime('%b %Y'),
-            'count': count
-        })
-    monthly_quotes.reverse()
+    quote_status_data = [
+        {'status': status, 'count': quote_counts[status]}
+        for status, _ in QuoteRequest.STATUS_CHOICES if quote_counts[status]
+    ]
+    
+    # Monthly quote trends (last 6 calendar months)
+    months = [today.replace(day=1)]
+    for i in range(5):
+        months.append((months[-1] - timedelta(days=1)).replace(day=1))
+    months.reverse()
+    per_month = dict(
+        DailyStats.objects.filter(date__gte=months[0])
+        .annotate(month=TruncMonth('date'))
+        .values('month')
+        .annotate(count=Sum('quotes'))
+        .values_list('month', 'count')
+    )
+    monthly_quotes = [
+        {'month': month.strftime('%b %Y'), 'count': per_month.get(month) or 0}
+        for month in months
+    ]
     
     context = {
         'stats': stats,
         'recent_quotes': recent_quotes,
         'recent_clients': recent_clients,
         'recent_products': recent_products,
-        'quote_status_data': list(quote_status_data),
+        'quote_status_data': quote_status_data,
         'monthly_quotes': monthly_quotes,
+        'funnel': funnel.weekly(),
+        'page_cache': page_cache_stats(),
+        'live_cursor': current_cursor(),
+        'live_stream': isinstance(request, ASGIRequest),
     }
     
     return render(request, 'admin/dashboard.html', context)
 
 
-@staff_member_required
-def admin_clients(request):
-    """Client management page"""
+def _filtered_clients(request):
+    """Clients matching the list's search, newest first - shared with the export"""
     search_query = request.GET.get('search', '')
-    clients = Client.objects.prefetch_related('quote_requests').all()
+    clients = Client.objects.all()
     
     if search_query:
-        clients = clients.filter(
-            Q(full_name__icontains=search_query) |
-            Q(phone_number__icontains=search_query) |
-            Q(email__icontains=search_query)
-        )
-    
-    clients = clients.order_by('-created_at')
+        clients = search_clients(search_query, clients)
     
-    # Add quote counts to each client
-    for client in clients:
-        client.total_quotes = client.quote_requests.count()
-        client.pending_quotes = client.quote_requests.filter(status='pending').count()
+    return clients.order_by('-created_at', '-id'), search_query
+
+
+@staff_member_required
+def admin_clients(request):
+    """Client management page"""
+    clients, search_query = _filtered_clients(request)
     
-    # Pagination
-    paginator = Paginator(clients, 20)
+    # Pagination - only the page's rows are fetched, and the count is cached
+    # until a client write bumps the analytics version
+    paginator = EstimatedCountPaginator(clients, 20, version=ANALYTICS)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
+    # Quote counts for this page in one grouped query
+    page_obj.object_list = list(
+        Client.objects.filter(id__in=[client.id for client in page_obj.object_list])
+        .annotate(
+            total_quotes=Count('quote_requests'),
+            pending_quotes=Count('quote_requests', filter=Q(quote_requests__status='pending')),
+            last_quote_at=Max('quote_requests__created_at'),
+        )
+        .order_by('-created_at', '-id')
+    )
+    
     context = {
         'page_obj': page_obj,
         'search_query': search_query,
-        'total_clients': Client.objects.count(),
+        'export_query': _export_query(request),
+        'total_clients': DailyStats.objects.aggregate(total=Sum('clients'))['total'] or 0,
     }
     
     return render(request, 'admin/clients.html', context)
@@ -110,12 +160,6 @@ def admin_products(request):
     
     products = Product.objects.select_related('category')
     
-    if search_query:
-        products = products.filter(
-            Q(name__icontains=search_query) |
-            Q(description__icontains=search_query)
-        )
-    
     if category_filter:
         products = products.filter(category_id=category_filter)
     
@@ -124,14 +168,20 @@ def admin_products(request):
     elif featured_filter == 'false':
         products = products.filter(is_featured=False)
     
-    products = products.order_by('-created_at')
+    if search_query:
+        # Full-text index lookup, best match first
+        products = search_products(search_query, products)
+    else:
+        products = products.order_by('-created_at')
     
     # Pagination
-    paginator = Paginator(products, 12)
+    paginator = EstimatedCountPaginator(products, 12, version=CATALOG)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
-    categories = Category.objects.all()
+    # Facet counts are stored on the category rows
+    categories = list(Category.objects.all())
+    catalog = totals(categories)
     
     context = {
         'page_obj': page_obj,
@@ -139,54 +189,169 @@ def admin_products(request):
         'search_query': search_query,
         'category_filter': category_filter,
         'featured_filter': featured_filter,
-        'total_products': Product.objects.count(),
+        'total_products': catalog['products'],
+        'featured_products': catalog['featured'],
+        'unfeatured_products': catalog['products'] - catalog['featured'],
     }
     
     return render(request, 'admin/products.html', context)
 
 
-@staff_member_required
-def admin_quotes(request):
-    """Quote management page"""
+def _filtered_quotes(request):
+    """Quotes matching the list's search and filters - shared with the export"""
     search_query = request.GET.get('search', '')
     status_filter = request.GET.get('status', '')
     quote_type_filter = request.GET.get('quote_type', '')
     
-    quotes = QuoteRequest.objects.select_related('client', 'product', 'measurements')
-    
-    if search_query:
-        quotes = quotes.filter(
-            Q(client__full_name__icontains=search_query) |
-            Q(client__phone_number__icontains=search_query) |
-            Q(product__name__icontains=search_query)
-        )
+    quotes = QuoteRequest.objects.all()
     
+    # Filters first, so a search only ranks quotes they let through
     if status_filter:
         quotes = quotes.filter(status=status_filter)
     
     if quote_type_filter:
         quotes = quotes.filter(quote_type=quote_type_filter)
     
-    quotes = quotes.order_by('-created_at')
+    if search_query:
+        # Best match first
+        quotes = search_quotes(search_query, quotes)
+    else:
+        quotes = quotes.order_by('-created_at')
+    
+    filters = {
+        'search_query': search_query,
+        'status_filter': status_filter,
+        'quote_type_filter': quote_type_filter,
+    }
+    return quotes, filters
+
+
+@staff_member_required
+def admin_quotes(request):
+    """Quote management page"""
+    quotes, filters = _filtered_quotes(request)
+    quotes = quotes.select_related('client', 'product', 'measurements')
     
     # Pagination
-    paginator = Paginator(quotes, 15)
+    paginator = EstimatedCountPaginator(quotes, 15, version=ANALYTICS)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
     context = {
         'page_obj': page_obj,
-        'search_query': search_query,
-        'status_filter': status_filter,
-        'quote_type_filter': quote_type_filter,
+        **filters,
+        'export_query': _export_query(request),
         'status_choices': QuoteRequest.STATUS_CHOICES,
         'quote_type_choices': QuoteRequest.QUOTE_TYPES,
-        'total_quotes': QuoteRequest.objects.count(),
+        'total_quotes': DailyStats.objects.aggregate(total=Sum('quotes'))['total'] or 0,
+        'live_cursor': current_cursor(),
+        'live_stream': isinstance(request, ASGIRequest),
     }
     
     return render(request, 'admin/quotes.html', context)
 
 
+@staff_member_required
+@require_POST
+def admin_quotes_bulk_status(request):
+    """
+    Apply one status to the ticked quotes, or with select_all to every quote
+    matching the list's filters (carried in the query string)
+    """
+    back = reverse('dashboard:quotes')
+    if request.GET:
+        back += f'?{request.GET.urlencode()}'
+    
+    to_status = request.POST.get('status')
+    statuses = dict(QuoteRequest.STATUS_CHOICES)
+    if to_status not in statuses:
+        messages.error(request, 'Choose a status to apply.')
+        return redirect(back)
+    
+    if request.POST.get('select_all'):
+        quotes, _ = _filtered_quotes(request)
+    else:
+        quote_ids = [quote_id for quote_id in request.POST.getlist('quote_ids') if quote_id.isdigit()]
+        if not quote_ids:
+            messages.error(request, 'Select at least one quote.')
+            return redirect(back)
+        quotes = QuoteRequest.objects.filter(pk__in=quote_ids)
+    
+    moved, skipped = bulk_transition(quotes, to_status, request.user)
+    if moved:
+        messages.success(request, f'{moved} quote{"s" if moved != 1 else ""} marked as {statuses[to_status]}.')
+    if skipped:
+        messages.warning(
+            request,
+            f'{skipped} quote{"s" if skipped != 1 else ""} left unchanged - '
+            f'they cannot move to {statuses[to_status]} from their current status.'
+        )
+    return redirect(back)
+
+
+QUOTE_EXPORT_COLUMNS = [
+    ('quote_id', 'id'),
+    ('created_at', 'created_at'),
+    ('status', 'status'),
+    ('quote_type', 'quote_type'),
+    ('client_name', 'client__full_name'),
+    ('client_phone', 'client__phone_number'),
+    ('client_email', 'client__email'),
+    ('product', 'product__name'),
+    ('custom_description', 'custom_description'),
+    ('fabric_preference', 'fabric_preference'),
+    ('additional_notes', 'additional_notes'),
+    ('chest', 'measurements__chest'),
+    ('waist', 'measurements__waist'),
+    ('hips', 'measurements__hips'),
+    ('shoulder', 'measurements__shoulder'),
+    ('sleeve_length', 'measurements__sleeve_length'),
+    ('full_length', 'measurements__full_length'),
+    ('measurement_notes', 'measurements__additional_notes'),
+]
+
+CLIENT_EXPORT_COLUMNS = [
+    ('client_id', 'id'),
+    ('full_name', 'full_name'),
+    ('phone_number', 'phone_number'),
+    ('email', 'email'),
+    ('created_at', 'created_at'),
+]
+
+
+def _export_query(request):
+    """The list's search and filters, for its export links"""
+    query = request.GET.copy()
+    query.pop('page', None)
+    query.pop('format', None)
+    return query.urlencode()
+
+
+def _export_format(request):
+    export_format = request.GET.get('format', 'csv')
+    return export_format if export_format in FORMATS else None
+
+
+@staff_member_required
+def admin_export_quotes(request):
+    """Stream the quotes matching the list's current filters as CSV or NDJSON"""
+    export_format = _export_format(request)
+    if export_format is None:
+        return HttpResponseBadRequest('format must be csv or ndjson')
+    quotes, _ = _filtered_quotes(request)
+    return stream_export(quotes, QUOTE_EXPORT_COLUMNS, export_format, 'quotes')
+
+
+@staff_member_required
+def admin_export_clients(request):
+    """Stream the clients matching the list's current search as CSV or NDJSON"""
+    export_format = _export_format(request)
+    if export_format is None:
+        return HttpResponseBadRequest('format must be csv or ndjson')
+    clients, _ = _filtered_clients(request)
+    return stream_export(clients, CLIENT_EXPORT_COLUMNS, export_format, 'clients')
+
+
 @staff_member_required
 def admin_quote_detail(request, quote_id):
     """Quote detail and edit page"""
@@ -195,47 +360,64 @@ def admin_quote_detail(request, quote_id):
     if request.method == 'POST':
         new_status = request.POST.get('status')
         if new_status in dict(QuoteRequest.STATUS_CHOICES):
-            quote.status = new_status
-            quote.save()
+            set_status(quote, new_status, request.user)
             messages.success(request, f'Quote status updated to {quote.get_status_display()}')
-            return redirect('admin:quote_detail', quote_id=quote.id)
+            return redirect('dashboard:quote_detail', quote_id=quote.id)
     
     context = {
         'quote': quote,
         'status_choices': QuoteRequest.STATUS_CHOICES,
+        'reference_job': ReferenceImageJob.objects.filter(quote=quote).first(),
+        'status_changes': quote.status_changes.select_related('changed_by'),
     }
     
     return render(request, 'admin/quote_detail.html', context)
 
 
+def _is_staff(request):
+    return request.user.is_active and request.user.is_staff
+
+
+async def admin_live_quotes(request):
+    """
+    Quotes added or changed after ?cursor= (or the Last-Event-ID an
+    EventSource reconnects with). Under ASGI a text/event-stream request is
+    answered with server-sent events; otherwise with one JSON batch to poll.
+    """
+    # The session lookup is sync ORM work
+    if not await sync_to_async(_is_staff)(request):
+        return JsonResponse({'error': 'Staff login required'}, status=403)
+    cursor = request.headers.get('Last-Event-ID') or request.GET.get('cursor', '')
+    try:
+        decode_cursor(cursor)
+    except InvalidCursor:
+        return JsonResponse({'error': 'cursor is missing or invalid'}, status=400)
+    
+    # Under WSGI a stream would hold a worker thread per open tab
+    if isinstance(request, ASGIRequest) and 'text/event-stream' in request.headers.get('Accept', ''):
+        response = StreamingHttpResponse(event_stream(cursor), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        # Stop nginx-style proxies from buffering the stream
+        response['X-Accel-Buffering'] = 'no'
+        return response
+    return JsonResponse(await sync_to_async(changes_since)(cursor))
+
+
 @staff_member_required
 def admin_analytics_api(request):
-    """API endpoint for dashboard analytics"""
-    # Quote status distribution
-    status_data = list(QuoteRequest.objects.values('status').annotate(count=Count('id')))
-    
-    # Monthly trends
-    today = timezone.now().date()
-    monthly_data = []
-    for i in range(12):
-        month_start = today.replace(day=1) - timedelta(days=i*30)
-        month_end = month_start + timedelta(days=30)
-        quotes_count = QuoteRequest.objects.filter(
-            created_at__date__gte=month_start,
-            created_at__date__lt=month_end
-        ).count()
-        clients_count = Client.objects.filter(
-            created_at__date__gte=month_start,
-            created_at__date__lt=month_end
-        ).count()
-        monthly_data.append({
-            'month': month_start.strftime('%b'),
-            'quotes': quotes_count,
-            'clients': clients_count
-        })
-    monthly_data.reverse()
-    
-    return JsonResponse({
-        'status_distribution': status_data,
-        'monthly_trends': monthly_data
-    })
\ No newline at end of file
+    """
+    API endpoint for dashboard analytics.
+    ?granularity=day|week|month (default month), ?range=<number of periods>
+    """
+    granularity = request.GET.get('granularity', 'month')
+    if granularity not in GRANULARITIES:
+        return JsonResponse({'error': f"granularity must be one of {', '.join(GRANULARITIES)}"}, status=400)
+    _, default_periods, max_periods, _ = GRANULARITIES[granularity]
+    try:
+        periods = int(request.GET.get('range', default_periods))
+    except ValueError:
+        return JsonResponse({'error': 'range must be a whole number of periods'}, status=400)
+    if not 1 <= periods <= max_periods:
+        return JsonResponse({'error': f'range must be between 1 and {max_periods} for {granularity}'}, status=400)
+    
+    return JsonResponse(analytics(granularity, periods))
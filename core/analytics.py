@@ -0,0 +1,94 @@
+"""
+Quote and client trends for the dashboard analytics API.
+
+Each request is answered with one GROUP BY per model over an indexed
+``created_at`` range, truncated to day, week or month in the site's time
+zone, plus one status aggregate. Results are cached under the ``analytics``
+version, which ``core.signals`` / ``core.stats`` bump whenever a quote or
+client is written, so a cached answer is never stale for longer than it
+takes the write to commit.
+"""
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+from django.utils import timezone
+
+from clients.models import Client
+from quotes.models import QuoteRequest
+
+from .cache import ANALYTICS, get_version
+
+
+CACHE_TIMEOUT = getattr(settings, 'ANALYTICS_CACHE_TIMEOUT', 60 * 15)
+
+# granularity: (truncation, default number of periods, maximum, label format)
+GRANULARITIES = {
+    'day': (TruncDay, 30, 366, '%d %b'),
+    'week': (TruncWeek, 12, 104, '%d %b'),
+    'month': (TruncMonth, 12, 60, '%b %Y'),
+}
+
+
+def period_starts(granularity, periods, today):
+    """The first day of each of the last ``periods`` periods, oldest first"""
+    if granularity == 'day':
+        return [today - timedelta(days=i) for i in reversed(range(periods))]
+    if granularity == 'week':
+        monday = today - timedelta(days=today.weekday())
+        return [monday - timedelta(weeks=i) for i in reversed(range(periods))]
+    starts = [today.replace(day=1)]
+    for _ in range(periods - 1):
+        starts.append((starts[-1] - timedelta(days=1)).replace(day=1))
+    return starts[::-1]
+
+
+def _counts(model, trunc, since):
+    rows = (
+        model.objects.filter(created_at__gte=since)
+        .annotate(period=trunc('created_at'))
+        .values('period')
+        .annotate(count=Count('id'))
+        .values_list('period', 'count')
+    )
+    return {timezone.localtime(period).date(): count for period, count in rows}
+
+
+def compute(granularity, periods):
+    trunc, _, _, label = GRANULARITIES[granularity]
+    starts = period_starts(granularity, periods, timezone.localdate())
+    since = timezone.make_aware(datetime.combine(starts[0], time.min))
+    quotes = _counts(QuoteRequest, trunc, since)
+    clients = _counts(Client, trunc, since)
+
+    status_counts = dict(QuoteRequest.objects.values('status').annotate(count=Count('id')).values_list('status', 'count'))
+    return {
+        'granularity': granularity,
+        'range': periods,
+        'status_distribution': [
+            {'status': status, 'count': status_counts[status]}
+            for status, _ in QuoteRequest.STATUS_CHOICES if status in status_counts
+        ],
+        'trends': [
+            {
+                'period': start.isoformat(),
+                'label': start.strftime(label),
+                'quotes': quotes.get(start, 0),
+                'clients': clients.get(start, 0),
+            }
+            for start in starts
+        ],
+    }
+
+
+def analytics(granularity='month', periods=None):
+    """Cached ``compute``; the key includes today so periods roll over at midnight"""
+    periods = periods or GRANULARITIES[granularity][1]
+    key = f'analytics:{get_version(ANALYTICS)}:{granularity}:{periods}:{timezone.localdate().isoformat()}'
+    data = cache.get(key)
+    if data is None:
+        data = compute(granularity, periods)
+        cache.set(key, data, CACHE_TIMEOUT)
+    return data
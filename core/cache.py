@@ -0,0 +1,115 @@
+"""
+Versioned caching of rendered public pages.
+
+Catalog pages (home, product list, product detail) only change when a
+product or category does, which is a few times a week. Their full
+responses are cached under keys that embed the ``catalog`` version number;
+``core.signals`` bumps that number after any catalog write commits, which
+retires every cached page at once without having to find and delete keys.
+"""
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.contrib import messages
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import CacheVersion
+
+
+CATALOG = 'catalog'
+
+# Dashboard analytics (core.analytics) - bumped on quote and client writes
+ANALYTICS = 'analytics'
+
+PAGE_CACHE_TIMEOUT = getattr(settings, 'CATALOG_PAGE_CACHE_TIMEOUT', 60 * 60 * 24)
+
+_HITS_KEY = 'catalog-page:hits'
+_MISSES_KEY = 'catalog-page:misses'
+
+
+def get_version(name):
+    """Current version of ``name`` (0 until it is first bumped)"""
+    version = CacheVersion.objects.filter(name=name).values_list('version', flat=True).first()
+    return version or 0
+
+
+def bump_version(name):
+    """Atomically increment the version of ``name``"""
+    if CacheVersion.objects.filter(name=name).update(version=F('version') + 1):
+        return
+    try:
+        with transaction.atomic():
+            CacheVersion.objects.create(name=name, version=1)
+    except IntegrityError:
+        # Another worker created the row first
+        CacheVersion.objects.filter(name=name).update(version=F('version') + 1)
+
+
+def bump_version_on_commit(name):
+    """Bump ``name`` once the current transaction commits (immediately outside one)"""
+    transaction.on_commit(lambda: bump_version(name))
+
+
+def _incr(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, None)
+
+
+def page_cache_stats():
+    """Hit/miss counters for the page cache, for the staff dashboard"""
+    hits = cache.get(_HITS_KEY, 0)
+    misses = cache.get(_MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(100 * hits / total) if total else 0,
+        'catalog_version': get_version(CATALOG),
+    }
+
+
+def _is_cacheable(request):
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    # Flash messages are rendered into the page - never cache one of those
+    return not len(messages.get_messages(request))
+
+
+def _page_key(request, version):
+    query = '&'.join(
+        f'{key}={value}'
+        for key, values in sorted(request.GET.lists())
+        for value in values
+    )
+    digest = hashlib.md5(f'{request.path}?{query}'.encode()).hexdigest()
+    return f'catalog-page:{version}:{digest}'
+
+
+def cache_catalog_page(view):
+    """
+    Serve ``view`` from the page cache, keyed on URL, query string and
+    catalog version. Only successful, cookie-free responses are stored.
+    """
+    @wraps(view)
+    def wrapped(request, *args, **kwargs):
+        if not _is_cacheable(request):
+            return view(request, *args, **kwargs)
+
+        key = _page_key(request, get_version(CATALOG))
+        response = cache.get(key)
+        if response is not None:
+            _incr(_HITS_KEY)
+            return response
+
+        _incr(_MISSES_KEY)
+        response = view(request, *args, **kwargs)
+        if response.status_code == 200 and not response.streaming and not response.cookies:
+            cache.set(key, response, PAGE_CACHE_TIMEOUT)
+        return response
+
+    return wrapped
@@ -0,0 +1,138 @@
+"""
+Small helpers shared by the full-text search backends.
+
+Production runs on PostgreSQL (``tsvector`` + GIN), development and tests on
+SQLite (FTS5 virtual tables). Both take the same user input, so query
+parsing lives here.
+"""
+import re
+
+from django.db import connection
+from django.db.models import FloatField
+from django.db.models.expressions import RawSQL
+
+
+MAX_TERMS = 8
+
+_TERM_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def search_terms(query):
+    """Split free text into at most ``MAX_TERMS`` lowercase word tokens"""
+    return [term.lower() for term in _TERM_RE.findall(query or '')][:MAX_TERMS]
+
+
+def fts5_match(terms):
+    """FTS5 MATCH expression requiring every term, each as a prefix"""
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def tsquery(terms):
+    """``to_tsquery`` input requiring every term, each as a prefix"""
+    return ' & '.join(f'{term}:*' for term in terms)
+
+
+def search_backend():
+    """Name of the full-text backend usable on the default database, or None"""
+    if connection.vendor == 'postgresql':
+        return 'postgresql'
+    if connection.vendor == 'sqlite' and sqlite_has_fts5():
+        return 'sqlite'
+    return None
+
+
+_fts5_available = None
+
+
+def sqlite_has_fts5():
+    """Whether the linked SQLite library was compiled with FTS5"""
+    global _fts5_available
+    if _fts5_available is None:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+            _fts5_available = bool(cursor.fetchone()[0])
+    return _fts5_available
+
+
+_trgm_available = None
+
+
+def postgres_has_trgm():
+    """Whether the pg_trgm extension is installed in the default database"""
+    global _trgm_available
+    if _trgm_available is None:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            _trgm_available = cursor.fetchone() is not None
+    return _trgm_available
+
+
+def like_pattern(term):
+    """``%term%`` for a raw LIKE/ILIKE, with LIKE wildcards in ``term`` escaped"""
+    escaped = term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f'%{escaped}%'
+
+
+class Fts5Table:
+    """
+    Upkeep of an FTS5 shadow table whose rowids are the ids of the rows it
+    indexes. ``select_sql`` yields ``(id, <columns>...)`` for every indexed
+    row; ``id_sql`` is how it names the id, so ``index`` can narrow it to
+    the given rows. The upkeep methods do nothing unless
+    ``search_backend()`` is SQLite - PostgreSQL indexes are computed by the
+    database.
+    
+    ``matching`` and ``rank`` put the MATCH inside the caller's query, so
+    its other filters, ordering and count apply to every match.
+    """
+    
+    def __init__(self, table, columns, select_sql, id_sql):
+        self.table = table
+        self.columns = columns
+        self.select_sql = select_sql
+        self.id_sql = id_sql
+    
+    def _insert_sql(self, where=''):
+        return f"INSERT INTO {self.table} (rowid, {', '.join(self.columns)}) {self.select_sql} {where}"
+    
+    def index(self, ids):
+        """(Re)index the rows with the given ids"""
+        ids = list(ids)
+        if not ids or search_backend() != 'sqlite':
+            return
+        placeholders = ', '.join(['%s'] * len(ids))
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table} WHERE rowid IN ({placeholders})', ids)
+            cursor.execute(self._insert_sql(f'WHERE {self.id_sql} IN ({placeholders})'), ids)
+    
+    def unindex(self, pk):
+        if search_backend() == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute(f'DELETE FROM {self.table} WHERE rowid = %s', [pk])
+    
+    def rebuild(self):
+        """Index every row from scratch"""
+        if search_backend() == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute(f'DELETE FROM {self.table}')
+                cursor.execute(self._insert_sql())
+    
+    def matching(self, terms):
+        """Subquery of the ids matching every term, for ``id__in``"""
+        return RawSQL(f'SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s', [fts5_match(terms)])
+    
+    def rank(self, terms, id_sql, weights):
+        """
+        ``bm25()`` of the row named by ``id_sql`` in the outer query, with
+        per-column ``weights``, negated so that higher is better as on
+        PostgreSQL
+        """
+        weights = ', '.join(str(float(weight)) for weight in weights)
+        return RawSQL(
+            f"""
+            SELECT -bm25({self.table}, {weights}) FROM {self.table}
+            WHERE {self.table} MATCH %s AND rowid = {id_sql}
+            """,
+            [fts5_match(terms)],
+            output_field=FloatField(),
+        )
@@ -0,0 +1,195 @@
+"""
+Weekly quote funnel: how many quotes reached reviewed, quoted, accepted and
+declined each week, and how long after submission they got there.
+
+Durations are counted into the fixed buckets of ``BUCKET_HOURS``, so
+``FunnelStats`` holds at most one row per week, stage and bucket and adding
+a quote is an ``F()`` update, as in ``core.stats``. Medians are read back
+from the bucket counts, interpolated within the bucket holding the middle
+quote, so the dashboard reads a few hundred rows however many quotes there
+are. Only a quote's first arrival at a stage counts - moving it back and
+forth does not inflate the funnel.
+
+``quotes.status`` calls ``record`` for every change it logs, deleting a
+quote takes its arrivals back out (``core.signals``), and ``rebuild``
+recomputes the weeks from the ``QuoteStatusChange`` log.
+"""
+from collections import Counter, defaultdict
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef, Sum
+from django.db.models.functions import TruncWeek
+from django.utils import timezone
+
+from quotes.models import QuoteRequest, QuoteStatusChange
+
+from .models import DailyStats, FunnelStats
+
+
+STAGES = ['reviewed', 'quoted', 'accepted', 'declined']
+
+# Upper bounds of the duration buckets in hours since submission; the last
+# bucket holds everything slower
+BUCKET_HOURS = [1, 4, 12, 24, 48, 72, 120, 168, 336, 720]
+
+
+def week_of(moment):
+    """Monday of the local week containing a date or datetime"""
+    day = timezone.localdate(moment) if isinstance(moment, datetime) else moment
+    return day - timedelta(days=day.weekday())
+
+
+def bucket_of(duration):
+    hours = duration.total_seconds() / 3600
+    for bucket, bound in enumerate(BUCKET_HOURS):
+        if hours < bound:
+            return bucket
+    return len(BUCKET_HOURS)
+
+
+def _arrivals(rows):
+    """
+    (week, stage, bucket) for each first arrival in ``rows`` of
+    (quote id, submitted at, status, changed at), ordered by quote and time
+    """
+    seen = set()
+    for quote_id, created_at, stage, changed_at in rows:
+        if stage not in STAGES or (quote_id, stage) in seen:
+            continue
+        seen.add((quote_id, stage))
+        yield week_of(changed_at), stage, bucket_of(changed_at - created_at)
+
+
+def _add(tallies, sign=1):
+    """Apply a Counter of (week, stage, bucket) -> quotes"""
+    FunnelStats.objects.bulk_create(
+        [FunnelStats(week=week, stage=stage, bucket=bucket) for week, stage, bucket in tallies],
+        ignore_conflicts=True,
+    )
+    for (week, stage, bucket), quotes in tallies.items():
+        FunnelStats.objects.filter(week=week, stage=stage, bucket=bucket).update(
+            quotes=F('quotes') + sign * quotes
+        )
+
+
+def record(quote_ids, to_status, changed_at):
+    """
+    Count the quotes in ``quote_ids`` reaching ``to_status`` at
+    ``changed_at``. Call it before the change is logged - a quote already
+    logged at ``to_status`` has been counted.
+    """
+    if to_status not in STAGES or not quote_ids:
+        return
+    submitted = (
+        QuoteRequest.objects.filter(pk__in=quote_ids)
+        .exclude(Exists(QuoteStatusChange.objects.filter(quote=OuterRef('pk'), to_status=to_status)))
+        .values_list('created_at', flat=True)
+    )
+    tallies = Counter(
+        (week_of(changed_at), to_status, bucket_of(changed_at - created_at))
+        for created_at in submitted
+    )
+    _add(tallies)
+
+
+def forget(quote):
+    """Take a quote's arrivals back out, before it is deleted"""
+    rows = quote.status_changes.order_by('changed_at', 'id').values_list(
+        'quote_id', 'quote__created_at', 'to_status', 'changed_at'
+    )
+    _add(Counter(_arrivals(rows)), sign=-1)
+
+
+def rebuild(FunnelStats, QuoteStatusChange, since=None):
+    """
+    Recompute the funnel from the status change log - every week, or the
+    weeks from ``since`` on. Models are passed in so migrations can use
+    their historical versions. Returns the number of weeks written.
+    """
+    changes = QuoteStatusChange.objects.filter(to_status__in=STAGES)
+    stale = FunnelStats.objects.all()
+    if since:
+        start = week_of(since)
+        starts_at = timezone.make_aware(datetime.combine(start, time.min))
+        # Arrivals before the range were counted in earlier weeks
+        earlier = QuoteStatusChange.objects.filter(
+            quote=OuterRef('quote'), to_status=OuterRef('to_status'), changed_at__lt=starts_at
+        )
+        changes = changes.filter(changed_at__gte=starts_at).exclude(Exists(earlier))
+        stale = stale.filter(week__gte=start)
+    rows = changes.order_by('quote_id', 'changed_at', 'id').values_list(
+        'quote_id', 'quote__created_at', 'to_status', 'changed_at'
+    )
+    tallies = Counter(_arrivals(rows.iterator(chunk_size=2000)))
+    with transaction.atomic():
+        stale.delete()
+        FunnelStats.objects.bulk_create([
+            FunnelStats(week=week, stage=stage, bucket=bucket, quotes=quotes)
+            for (week, stage, bucket), quotes in tallies.items()
+        ], batch_size=500)
+    return len({week for week, _, _ in tallies})
+
+
+def median_hours(buckets):
+    """Median from a Counter of bucket -> quotes, interpolated within its bucket"""
+    total = sum(buckets.values())
+    if not total:
+        return None
+    middle = total / 2
+    seen = 0
+    for bucket in range(len(BUCKET_HOURS) + 1):
+        quotes = buckets.get(bucket, 0)
+        if quotes and seen + quotes >= middle:
+            low = BUCKET_HOURS[bucket - 1] if bucket else 0
+            if bucket == len(BUCKET_HOURS):
+                return low
+            return low + (BUCKET_HOURS[bucket] - low) * (middle - seen) / quotes
+        seen += quotes
+
+
+def duration_label(hours):
+    if hours is None:
+        return ''
+    if hours < 48:
+        return f'{hours:.1f} h'
+    return f'{hours / 24:.1f} d'
+
+
+def weekly(weeks=8):
+    """The last ``weeks`` weeks of the funnel, oldest first"""
+    first = week_of(timezone.localdate()) - timedelta(weeks=weeks - 1)
+    buckets = defaultdict(Counter)
+    rows = FunnelStats.objects.filter(week__gte=first).values_list('week', 'stage', 'bucket', 'quotes')
+    for week, stage, bucket, quotes in rows:
+        buckets[week, stage][bucket] += quotes
+
+    # Submissions per week come from the daily rollup
+    submitted = dict(
+        DailyStats.objects.filter(date__gte=first)
+        .annotate(week=TruncWeek('date'))
+        .values('week')
+        .annotate(total=Sum('quotes'))
+        .values_list('week', 'total')
+    )
+
+    funnel = []
+    for i in range(weeks):
+        week = first + timedelta(weeks=i)
+        stages = {}
+        for stage in STAGES:
+            median = median_hours(buckets[week, stage])
+            stages[stage] = {
+                'quotes': sum(buckets[week, stage].values()),
+                'median_hours': round(median, 1) if median is not None else None,
+                'median_label': duration_label(median),
+            }
+        decided = stages['accepted']['quotes'] + stages['declined']['quotes']
+        funnel.append({
+            'week': week,
+            'label': week.strftime('%d %b'),
+            'submitted': submitted.get(week) or 0,
+            'stages': stages,
+            'win_rate': round(100 * stages['accepted']['quotes'] / decided) if decided else None,
+        })
+    return funnel
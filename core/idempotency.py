@@ -0,0 +1,86 @@
+"""
+Idempotency keys for the quote and contact forms.
+
+Each form page carries a random key in a hidden field. The first POST with
+that key records it, together with the URL it redirected to, inside the
+transaction that saves the submission. A retried POST - usually a flaky
+mobile connection resubmitting - finds the key with one indexed SELECT and
+gets the same redirect without touching the write path. Two copies racing
+each other are settled by the unique index: the loser raises ``Replayed``
+before it has written anything.
+
+Keys are kept for ``IDEMPOTENCY_KEY_TTL_HOURS`` and then removed by
+``manage.py purge_idempotency_keys``.
+"""
+import re
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib import messages
+from django.db import IntegrityError, transaction
+from django.shortcuts import redirect
+from django.utils import timezone
+
+from .models import IdempotencyKey
+
+
+FIELD_NAME = 'idempotency_key'
+
+_KEY_RE = re.compile(r'[0-9a-f]{32}')
+
+
+class Replayed(Exception):
+    """The submission was already handled; ``redirect_to`` is where it went"""
+
+    def __init__(self, redirect_to):
+        super().__init__(redirect_to)
+        self.redirect_to = redirect_to
+
+
+def posted_key(request):
+    value = request.POST.get(FIELD_NAME, '')
+    return value if _KEY_RE.fullmatch(value) else ''
+
+
+def form_key(request):
+    """Key for the form being rendered - kept across validation errors"""
+    if request.method == 'POST':
+        return posted_key(request) or uuid.uuid4().hex
+    return uuid.uuid4().hex
+
+
+def replayed_redirect(request):
+    """Where the earlier copy of this POST redirected to, or None"""
+    key = posted_key(request)
+    if not key:
+        return None
+    return IdempotencyKey.objects.filter(key=key).values_list('redirect_to', flat=True).first()
+
+
+def replay_response(request, redirect_to):
+    messages.info(request, 'We already received this submission - no need to send it again.')
+    return redirect(redirect_to)
+
+
+def record(request, redirect_to):
+    """
+    Claim this POST's key. Call first inside the transaction that does the
+    writes; raises ``Replayed`` if another copy of the POST got there first.
+    """
+    key = posted_key(request)
+    if not key:
+        return
+    try:
+        with transaction.atomic():
+            IdempotencyKey.objects.create(key=key, redirect_to=redirect_to)
+    except IntegrityError:
+        raise Replayed(
+            IdempotencyKey.objects.filter(key=key).values_list('redirect_to', flat=True).first() or redirect_to
+        )
+
+
+def purge_expired():
+    cutoff = timezone.now() - timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS)
+    deleted, _ = IdempotencyKey.objects.filter(created_at__lt=cutoff).delete()
+    return deleted
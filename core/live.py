@@ -0,0 +1,138 @@
+"""
+Change feed behind the live dashboard.
+
+The dashboard remembers a cursor - the ``(updated_at, id)`` of the last quote
+it has seen - and asks for quotes written after it, in that order, over the
+``quote_updated_idx`` index. New quotes and status changes both move
+``updated_at``, so one query covers them. Rows from the last
+``SETTLE_SECONDS`` are held back: a transaction that stamped an earlier
+``updated_at`` but commits later would otherwise land behind the cursor and
+never be sent.
+
+Under ASGI ``event_stream`` pushes the feed as server-sent events, awaiting
+between polls so an open tab holds no worker thread; everywhere else the
+browser polls ``changes_since`` directly.
+"""
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Q, Sum
+from django.urls import reverse
+from django.utils import timezone
+
+from quotes.models import QuoteRequest
+
+from .cache import ANALYTICS
+from .models import DailyStats
+from .pagination import approximate_count
+
+
+SETTLE_SECONDS = 2
+BATCH_SIZE = 50
+
+POLL_SECONDS = getattr(settings, 'LIVE_DASHBOARD_POLL_SECONDS', 3)
+HEARTBEAT_SECONDS = 15
+# Streams end after this long and the browser reconnects with Last-Event-ID,
+# so a tab left open never outlives a deploy or a logout for long
+STREAM_SECONDS = 5 * 60
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(updated_at, pk):
+    """``<microseconds since the epoch>-<id>`` - URL and header safe"""
+    return f'{(updated_at - EPOCH) // timedelta(microseconds=1)}-{pk}'
+
+
+def decode_cursor(value):
+    try:
+        micros, pk = value.split('-')
+        return EPOCH + timedelta(microseconds=int(micros)), int(pk)
+    except (AttributeError, ValueError, OverflowError):
+        raise InvalidCursor(value)
+
+
+def _settled():
+    return QuoteRequest.objects.filter(updated_at__lte=timezone.now() - timedelta(seconds=SETTLE_SECONDS))
+
+
+def current_cursor():
+    """Cursor for a page rendered now; later writes arrive through the feed"""
+    latest = _settled().order_by('-updated_at', '-id').values_list('updated_at', 'id').first()
+    if latest is None:
+        return encode_cursor(EPOCH, 0)
+    return encode_cursor(*latest)
+
+
+def _event(quote, since):
+    return {
+        'id': quote.id,
+        'is_new': quote.created_at > since,
+        'status': quote.status,
+        'status_display': quote.get_status_display(),
+        'quote_type': quote.quote_type,
+        'client': quote.client.full_name,
+        'phone_number': quote.client.phone_number,
+        'product': quote.product.name if quote.product_id else None,
+        'created_at': quote.created_at.isoformat(),
+        'url': reverse('dashboard:quote_detail', args=[quote.id]),
+    }
+
+
+def changes_since(cursor):
+    """
+    Quotes written after ``cursor`` (at most ``BATCH_SIZE``), the cursor to
+    ask with next time and - only when something changed - the dashboard's
+    quote counters.
+    """
+    since, pk = decode_cursor(cursor)
+    quotes = list(
+        _settled()
+        .filter(Q(updated_at__gt=since) | Q(updated_at=since, id__gt=pk))
+        .select_related('client', 'product')
+        .order_by('updated_at', 'id')[:BATCH_SIZE]
+    )
+    if not quotes:
+        return {'cursor': cursor, 'quotes': [], 'counts': None}
+    # Neither counter scans the quote table: the total comes from the daily
+    # rollup and the pending count is cached until a quote write bumps
+    # the analytics version
+    pending, _ = approximate_count(QuoteRequest.objects.filter(status='pending'), version=ANALYTICS)
+    return {
+        'cursor': encode_cursor(quotes[-1].updated_at, quotes[-1].id),
+        'quotes': [_event(quote, since) for quote in quotes],
+        'counts': {
+            'total_quotes': DailyStats.objects.aggregate(total=Sum('quotes'))['total'] or 0,
+            'pending_quotes': pending,
+        },
+    }
+
+
+async def event_stream(cursor):
+    """Server-sent events for ``changes_since``, until ``STREAM_SECONDS`` pass"""
+    poll = sync_to_async(changes_since)
+    deadline = time.monotonic() + STREAM_SECONDS
+    last_sent = time.monotonic()
+    yield f'retry: {POLL_SECONDS * 1000}\n\n'
+    while time.monotonic() < deadline:
+        payload = await poll(cursor)
+        if payload['quotes']:
+            cursor = payload['cursor']
+            yield f'id: {cursor}\nevent: quotes\ndata: {json.dumps(payload)}\n\n'
+            last_sent = time.monotonic()
+            if len(payload['quotes']) == BATCH_SIZE:
+                # More waiting - fetch it now
+                continue
+        elif time.monotonic() - last_sent >= HEARTBEAT_SECONDS:
+            # Keeps proxies from closing an idle connection
+            yield ': keep-alive\n\n'
+            last_sent = time.monotonic()
+        await asyncio.sleep(POLL_SECONDS)
@@ -0,0 +1,68 @@
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.idempotency import purge_expired
+from core.outbox import BATCH_SIZE, claim_batch, requeue_dead, send_batch
+
+
+class Command(BaseCommand):
+    help = (
+        'Send queued notification emails in batches, one SMTP connection per batch. '
+        'Runs until stopped unless --once is given, deleting expired idempotency keys '
+        'along the way.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument(
+            '--poll', type=float, default=5.0,
+            help='Seconds to wait before checking an empty outbox again'
+        )
+        parser.add_argument('--once', action='store_true', help='Exit when nothing is due')
+        parser.add_argument(
+            '--requeue-dead', action='store_true',
+            help='Give dead-lettered messages a fresh set of attempts first'
+        )
+        parser.add_argument(
+            '--purge-every', type=float, default=3600.0,
+            help='Seconds between deletions of expired idempotency keys (0 to never delete them)'
+        )
+
+    def handle(self, *args, **options):
+        if options['requeue_dead']:
+            self.stdout.write(f'{requeue_dead()} dead messages requeued')
+
+        self.running = True
+
+        def stop(*args):
+            self.running = False
+        signal.signal(signal.SIGTERM, stop)
+
+        totals = [0, 0, 0]
+        purge_every = options['purge_every']
+        next_purge = time.monotonic()
+        try:
+            while self.running:
+                # The keys table only grows otherwise; this process is always running
+                if purge_every and time.monotonic() >= next_purge:
+                    deleted = purge_expired()
+                    if deleted:
+                        self.stdout.write(f'{deleted} expired idempotency keys deleted')
+                    next_purge = time.monotonic() + purge_every
+                batch = claim_batch(options['batch_size'])
+                if not batch:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll'])
+                    continue
+                sent, retried, dead = send_batch(batch)
+                totals = [totals[0] + sent, totals[1] + retried, totals[2] + dead]
+                self.stdout.write(f'Batch of {len(batch)}: {sent} sent, {retried} to retry, {dead} dead-lettered')
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{totals[0]} sent, {totals[1]} to retry, {totals[2]} dead-lettered'
+        ))
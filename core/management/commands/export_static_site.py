@@ -0,0 +1,163 @@
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+
+from products.models import Category, Product, RelatedProduct
+from products.views import PRODUCTS_PER_PAGE
+
+
+MANIFEST_NAME = '.export-manifest.json'
+
+
+def _fingerprint(*parts):
+    return hashlib.sha1(repr(parts).encode()).hexdigest()
+
+
+def _chunks(rows, size):
+    return [rows[i:i + size] for i in range(0, len(rows), size)] or [[]]
+
+
+class Command(BaseCommand):
+    help = (
+        'Pre-render the public catalog pages (home, about, product lists and details) to '
+        'static HTML. Only pages whose inputs changed since the last run are re-rendered. '
+        'Run after collectstatic with DEBUG off so asset URLs are the hashed ones.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output', default=str(settings.STATIC_EXPORT_ROOT),
+            help='Directory to write the site to (default: STATIC_EXPORT_ROOT)'
+        )
+        parser.add_argument(
+            '--full', action='store_true',
+            help='Re-render every page even if its inputs are unchanged'
+        )
+        parser.add_argument(
+            '--host', default='localhost',
+            help='Host name to render pages for (must be in ALLOWED_HOSTS)'
+        )
+
+    def handle(self, *args, **options):
+        output = Path(options['output'])
+        output.mkdir(parents=True, exist_ok=True)
+        manifest_path = output / MANIFEST_NAME
+        previous = {}
+        if manifest_path.exists() and not options['full']:
+            previous = json.loads(manifest_path.read_text())
+
+        started = time.monotonic()
+        pages = self.collect_pages()
+        client = Client(HTTP_HOST=options['host'])
+
+        rendered = skipped = 0
+        manifest = {}
+        for target, (source, fingerprint) in pages.items():
+            destination = self.destination(output, target)
+            if previous.get(target) == fingerprint and destination.exists():
+                manifest[target] = fingerprint
+                skipped += 1
+                continue
+
+            response = client.get(source)
+            if response.status_code != 200:
+                raise CommandError(f'{source} returned HTTP {response.status_code}')
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            temporary = destination.with_suffix('.tmp')
+            temporary.write_bytes(response.content)
+            os.replace(temporary, destination)
+            manifest[target] = fingerprint
+            rendered += 1
+
+        removed = 0
+        for target in set(previous) - set(pages):
+            destination = self.destination(output, target)
+            if destination.exists():
+                destination.unlink()
+                removed += 1
+            for directory in destination.parents:
+                if directory == output or any(directory.iterdir()):
+                    break
+                directory.rmdir()
+
+        manifest_path.write_text(json.dumps(manifest, indent=0, sort_keys=True))
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'{rendered} pages rendered, {skipped} unchanged, {removed} removed in {elapsed:.1f}s -> {output}'
+        ))
+
+    def destination(self, output, target):
+        return output / target.strip('/') / 'index.html'
+
+    def templates_fingerprint(self):
+        """Any template or static asset change re-renders everything"""
+        entries = []
+        for directory in settings.TEMPLATES[0]['DIRS']:
+            for path in sorted(Path(directory).rglob('*.html')):
+                stat = path.stat()
+                entries.append((str(path), stat.st_mtime_ns, stat.st_size))
+        manifest_name = getattr(staticfiles_storage, 'manifest_name', None)
+        if manifest_name and staticfiles_storage.exists(manifest_name):
+            with staticfiles_storage.open(manifest_name) as manifest:
+                entries.append(hashlib.sha1(manifest.read()).hexdigest())
+        return _fingerprint(entries)
+
+    def collect_pages(self):
+        """
+        Map each page's URL to (URL to render it from, fingerprint of its inputs).
+
+        Fingerprints are built from ids and ``updated_at`` values loaded in a
+        few queries, so deciding what to re-render costs almost nothing.
+        """
+        templates = self.templates_fingerprint()
+        categories = list(Category.objects.values_list('id', 'slug', 'updated_at'))
+        category_bar = _fingerprint(categories)
+        category_updated = {category_id: updated for category_id, _, updated in categories}
+
+        products = list(Product.objects.values_list(
+            'id', 'slug', 'category_id', 'is_featured', 'updated_at'
+        ))
+        product_updated = {row[0]: row[4] for row in products}
+
+        pages = {
+            '/': ('/', _fingerprint(templates, category_bar, [
+                (product_id, updated) for product_id, _, _, featured, updated in products if featured
+            ][:6])),
+            '/about/': ('/about/', _fingerprint(templates)),
+        }
+
+        # Listing pages, all products and per category
+        listings = [(None, products)] + [
+            (slug, [row for row in products if row[2] == category_id])
+            for category_id, slug, _ in categories
+        ]
+        for slug, rows in listings:
+            chunks = _chunks([(row[0], row[4]) for row in rows], PRODUCTS_PER_PAGE)
+            for number, chunk in enumerate(chunks, start=1):
+                base = f'/products/category/{slug}/' if slug else '/products/'
+                source = f'{base}page/{number}/'
+                fingerprint = _fingerprint(templates, category_bar, chunk, len(chunks))
+                pages[source] = (source, fingerprint)
+                if number == 1:
+                    pages[base] = (source, fingerprint)
+
+        # Detail pages embed their related products
+        related = {}
+        for product_id, related_id in RelatedProduct.objects.values_list('product_id', 'related_id'):
+            related.setdefault(product_id, []).append((related_id, product_updated.get(related_id)))
+        for product_id, slug, category_id, _, updated in products:
+            neighbours = related.get(product_id) or [
+                (row[0], row[4]) for row in products if row[2] == category_id and row[0] != product_id
+            ][:4]
+            pages[f'/products/{slug}/'] = (f'/products/{slug}/', _fingerprint(
+                templates, updated, category_updated.get(category_id), neighbours
+            ))
+
+        return pages
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from clients.models import Client
+from core.models import DailyStats
+from core.stats import rebuild
+from quotes.models import QuoteRequest
+
+
+class Command(BaseCommand):
+    help = 'Recompute the daily quote and client totals behind the dashboard'
+
+    def handle(self, *args, **options):
+        days = rebuild(DailyStats, QuoteRequest, Client)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt daily stats for {days} days'))
@@ -0,0 +1,36 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.funnel import rebuild
+from core.models import FunnelStats
+from quotes.models import QuoteRequest, QuoteStatusChange
+from quotes.status import backfill_history
+
+
+class Command(BaseCommand):
+    help = 'Recompute the weekly quote funnel behind the dashboard from the status history'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--since',
+            help='Only rebuild the weeks from this date (YYYY-MM-DD) on',
+        )
+        parser.add_argument(
+            '--backfill',
+            action='store_true',
+            help='First log a change for quotes that left pending before changes were recorded',
+        )
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            try:
+                since = date.fromisoformat(options['since'])
+            except ValueError:
+                raise CommandError('--since must be a date in the form YYYY-MM-DD')
+        if options['backfill']:
+            logged = backfill_history(QuoteRequest, QuoteStatusChange)
+            self.stdout.write(f'Logged {logged} earlier status changes')
+        weeks = rebuild(FunnelStats, QuoteStatusChange, since=since)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt the quote funnel for {weeks} weeks'))
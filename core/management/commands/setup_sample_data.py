@@ -3,6 +3,7 @@ from django.utils import timezone
 from datetime import date, timedelta
 from products.models import Category, Product
 from clients.models import Client
+from clients.phone import normalize_phone
 from quotes.models import QuoteRequest, Measurements
 
 
@@ -98,7 +99,7 @@ class Command(BaseCommand):
         
         for client_data in clients_data:
             client, created = Client.objects.get_or_create(
-                phone_number=client_data['phone_number'],
+                phone_number=normalize_phone(client_data['phone_number']),
                 defaults={
                     'full_name': client_data['full_name'],
                     'email': client_data['email'] if client_data['email'] else None,
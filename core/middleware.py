@@ -0,0 +1,21 @@
+"""
+WhiteNoise serving of the pre-rendered public pages (``export_static_site``).
+
+An exported page is the render of its bare URL with nobody's messages
+attached. A request with a query string (``?category=``, ``?page=``,
+``?cursor=``, search and sort parameters) or with a flash message waiting
+for it - the redirect after a quote or contact form - goes to the dynamic
+view instead. Static assets are served as usual either way.
+"""
+from django.contrib.messages.storage.cookie import CookieStorage
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+
+class StaticExportMiddleware(WhiteNoiseMiddleware):
+
+    def __call__(self, request):
+        if not request.path_info.startswith(self.static_prefix) and (
+            request.META.get('QUERY_STRING') or CookieStorage.cookie_name in request.COOKIES
+        ):
+            return self.get_response(request)
+        return super().__call__(request)
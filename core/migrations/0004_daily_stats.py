@@ -0,0 +1,46 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:37
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+
+def fill_daily_stats(apps, schema_editor):
+    """New quotes and clients per day, counted from the source tables"""
+    DailyStats = apps.get_model('core', 'DailyStats')
+    sources = (
+        ('quotes', apps.get_model('quotes', 'QuoteRequest')),
+        ('clients', apps.get_model('clients', 'Client')),
+    )
+    days = {}
+    for field, model in sources:
+        per_day = model.objects.annotate(day=TruncDate('created_at')).values('day').annotate(total=Count('id'))
+        for row in per_day:
+            days.setdefault(row['day'], {'quotes': 0, 'clients': 0})[field] = row['total']
+    DailyStats.objects.bulk_create([DailyStats(date=day, **totals) for day, totals in days.items()])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_idempotency_key'),
+        ('clients', '0003_unique_phone_number'),
+        ('quotes', '0004_measurement_history'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('quotes', models.IntegerField(default=0)),
+                ('clients', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'Daily stats',
+                'ordering': ['date'],
+            },
+        ),
+        migrations.RunPython(fill_daily_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,88 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:53
+
+from collections import Counter
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+# Frozen copies of the core.funnel settings this migration was written with
+STAGES = ['reviewed', 'quoted', 'accepted', 'declined']
+BUCKET_HOURS = [1, 4, 12, 24, 48, 72, 120, 168, 336, 720]
+
+
+def bucket_of(duration):
+    hours = duration.total_seconds() / 3600
+    for bucket, bound in enumerate(BUCKET_HOURS):
+        if hours < bound:
+            return bucket
+    return len(BUCKET_HOURS)
+
+
+def fill_funnel_stats(apps, schema_editor):
+    QuoteRequest = apps.get_model('quotes', 'QuoteRequest')
+    QuoteStatusChange = apps.get_model('quotes', 'QuoteStatusChange')
+    FunnelStats = apps.get_model('core', 'FunnelStats')
+
+    # Quotes that left pending before changes were logged get one change,
+    # dated at their last update
+    unlogged = (
+        QuoteRequest.objects.exclude(status='pending')
+        .filter(status_changes__isnull=True)
+        .values_list('id', 'status', 'updated_at')
+    )
+    QuoteStatusChange.objects.bulk_create([
+        QuoteStatusChange(quote_id=quote_id, from_status='pending', to_status=status, changed_at=updated_at)
+        for quote_id, status, updated_at in unlogged.iterator(chunk_size=2000)
+    ], batch_size=500)
+
+    # First arrival of each quote at each stage, by local week and bucket
+    rows = (
+        QuoteStatusChange.objects.filter(to_status__in=STAGES)
+        .order_by('quote_id', 'changed_at', 'id')
+        .values_list('quote_id', 'quote__created_at', 'to_status', 'changed_at')
+    )
+    seen = set()
+    tallies = Counter()
+    for quote_id, created_at, stage, changed_at in rows.iterator(chunk_size=2000):
+        if (quote_id, stage) in seen:
+            continue
+        seen.add((quote_id, stage))
+        day = timezone.localdate(changed_at)
+        week = day - timedelta(days=day.weekday())
+        tallies[week, stage, bucket_of(changed_at - created_at)] += 1
+    FunnelStats.objects.bulk_create([
+        FunnelStats(week=week, stage=stage, bucket=bucket, quotes=quotes)
+        for (week, stage, bucket), quotes in tallies.items()
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_daily_stats'),
+        ('quotes', '0009_quote_status_stage_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FunnelStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('week', models.DateField(help_text='Monday of the week')),
+                ('stage', models.CharField(max_length=10)),
+                ('bucket', models.PositiveSmallIntegerField(help_text='Index into core.funnel.BUCKET_HOURS')),
+                ('quotes', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'Funnel stats',
+                'ordering': ['week', 'stage', 'bucket'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='funnelstats',
+            constraint=models.UniqueConstraint(fields=('week', 'stage', 'bucket'), name='funnel_stats_unique'),
+        ),
+        migrations.RunPython(fill_funnel_stats, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,111 @@
 from django.db import models
+from django.utils import timezone
 
-# Core app doesn't need specific models
-# This file is kept for Django app structure
\ No newline at end of file
+
+class CacheVersion(models.Model):
+    """
+    Monotonic version counter for a family of cached data.
+
+    Cache keys embed the current version, so bumping it invalidates every
+    entry at once. It lives in the database rather than the cache so all
+    gunicorn workers agree on it even with a per-process cache backend.
+    """
+    name = models.CharField(max_length=50, unique=True)
+    version = models.PositiveBigIntegerField(default=1)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.name} v{self.version}"
+
+
+class OutboxMessage(models.Model):
+    """
+    An email waiting to be sent, written in the same transaction as whatever
+    caused it and delivered later by ``manage.py drain_outbox``.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('dead', 'Dead'),
+    ]
+    
+    kind = models.CharField(max_length=30, help_text="What triggered it, e.g. quote_request or contact")
+    recipients = models.JSONField(default=list)
+    reply_to = models.EmailField(blank=True)
+    subject = models.CharField(max_length=200)
+    body = models.TextField()
+    
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claim = models.UUIDField(blank=True, null=True, help_text="Batch that is currently sending it")
+    claimed_at = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+    
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            # The drain worker's batch query
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_due_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.subject} ({self.status})"
+
+
+class IdempotencyKey(models.Model):
+    """
+    A form POST that has already been handled. Written in the same
+    transaction as the rows the POST created, so a retried submission can
+    be answered with the original redirect instead of running again.
+    """
+    key = models.CharField(max_length=64, unique=True)
+    redirect_to = models.CharField(max_length=500)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    
+    def __str__(self):
+        return self.key
+
+
+class DailyStats(models.Model):
+    """
+    New quotes and clients per day, for dashboard totals and trends.
+    Kept current by ``core.stats`` as rows are written; rebuilt from the
+    source tables by ``manage.py rebuild_daily_stats``.
+    """
+    date = models.DateField(unique=True)
+    quotes = models.IntegerField(default=0)
+    clients = models.IntegerField(default=0)
+    
+    class Meta:
+        ordering = ['date']
+        verbose_name_plural = "Daily stats"
+    
+    def __str__(self):
+        return f"{self.date}: {self.quotes} quotes, {self.clients} clients"
+
+
+class FunnelStats(models.Model):
+    """
+    Quotes reaching each status for the first time, per week, grouped by
+    how long after submission they got there. Kept current by
+    ``core.funnel`` as statuses change; rebuilt from the status history by
+    ``manage.py rebuild_funnel_stats``.
+    """
+    week = models.DateField(help_text="Monday of the week")
+    stage = models.CharField(max_length=10)
+    bucket = models.PositiveSmallIntegerField(help_text="Index into core.funnel.BUCKET_HOURS")
+    quotes = models.IntegerField(default=0)
+    
+    class Meta:
+        ordering = ['week', 'stage', 'bucket']
+        verbose_name_plural = "Funnel stats"
+        constraints = [
+            models.UniqueConstraint(fields=['week', 'stage', 'bucket'], name='funnel_stats_unique'),
+        ]
+    
+    def __str__(self):
+        return f"{self.week} {self.stage} bucket {self.bucket}: {self.quotes} quotes"
@@ -0,0 +1,145 @@
+"""
+Transactional email outbox.
+
+Views call ``enqueue`` inside the transaction that saves the quote or contact
+message, so a notification exists exactly when the data it describes does,
+and the request never waits on SMTP. ``manage.py drain_outbox`` delivers due
+messages in batches over one SMTP connection per batch. Failed messages are
+retried with exponential backoff and dead-lettered after ``MAX_ATTEMPTS``.
+"""
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import Case, F, PositiveSmallIntegerField, Q, When
+from django.utils import timezone
+
+from .models import OutboxMessage
+
+
+BATCH_SIZE = 50
+MAX_ATTEMPTS = 6
+
+# 1, 2, 4, 8... minutes between attempts, at most six hours
+BACKOFF_BASE = timedelta(minutes=1)
+BACKOFF_MAX = timedelta(hours=6)
+
+# A batch still "sending" after this long belonged to a worker that died
+STALE_AFTER = timedelta(minutes=15)
+
+
+def enqueue(kind, subject, body, recipients=None, reply_to=''):
+    """Queue an email; ``recipients`` defaults to the business inbox"""
+    recipients = [address.strip() for address in (recipients or settings.NOTIFICATION_EMAILS) if address.strip()]
+    if not recipients:
+        return None
+    return OutboxMessage.objects.create(
+        kind=kind,
+        recipients=recipients,
+        reply_to=reply_to or '',
+        subject=subject[:200],
+        body=body,
+    )
+
+
+def backoff(attempts):
+    return min(BACKOFF_BASE * 2 ** max(attempts - 1, 0), BACKOFF_MAX)
+
+
+def claim_batch(batch_size=BATCH_SIZE):
+    """Mark up to ``batch_size`` due messages as ours and return them"""
+    now = timezone.now()
+    stale = Q(status='sending', claimed_at__lt=now - STALE_AFTER)
+    # A worker dying mid-send costs the message an attempt, so one that
+    # keeps crashing the worker is dead-lettered like any other failure
+    OutboxMessage.objects.filter(stale, attempts__gte=MAX_ATTEMPTS - 1).update(
+        status='dead', attempts=F('attempts') + 1, claim=None, last_error='Worker stopped while sending'
+    )
+    due = Q(status='pending', next_attempt_at__lte=now) | stale
+    candidates = list(
+        OutboxMessage.objects.filter(due).order_by('next_attempt_at').values_list('id', flat=True)[:batch_size]
+    )
+    if not candidates:
+        return []
+    claim = uuid.uuid4()
+    # Rows another worker claimed in the meantime no longer match ``due``
+    OutboxMessage.objects.filter(due, pk__in=candidates).update(
+        status='sending',
+        claim=claim,
+        claimed_at=now,
+        attempts=Case(
+            When(status='sending', then=F('attempts') + 1),
+            default=F('attempts'),
+            output_field=PositiveSmallIntegerField(),
+        ),
+    )
+    return list(OutboxMessage.objects.filter(claim=claim, status='sending'))
+
+
+def _failed(message, error):
+    attempts = message.attempts + 1
+    fields = {'attempts': attempts, 'last_error': error[:2000], 'claim': None}
+    if attempts >= MAX_ATTEMPTS:
+        fields['status'] = 'dead'
+    else:
+        fields['status'] = 'pending'
+        fields['next_attempt_at'] = timezone.now() + backoff(attempts)
+    OutboxMessage.objects.filter(pk=message.pk, claim=message.claim).update(**fields)
+    return fields['status']
+
+
+def send_batch(messages):
+    """Deliver claimed messages over one connection. Returns (sent, retried, dead)"""
+    if not messages:
+        return 0, 0, 0
+    sent_ids = []
+    outcomes = {'pending': 0, 'dead': 0}
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as e:
+        # Nothing can go out; every message waits for the next attempt
+        for message in messages:
+            outcomes[_failed(message, f'Connection failed: {e}')] += 1
+        return 0, outcomes['pending'], outcomes['dead']
+
+    try:
+        for position, message in enumerate(messages):
+            email = EmailMessage(
+                subject=message.subject,
+                body=message.body,
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                to=message.recipients,
+                reply_to=[message.reply_to] if message.reply_to else None,
+                connection=connection,
+            )
+            try:
+                email.send()
+            except Exception as e:
+                outcomes[_failed(message, f'{type(e).__name__}: {e}')] += 1
+                # The server may have dropped us - reconnect once for the rest
+                # of the batch, or send_messages() would open one per message
+                connection.close()
+                try:
+                    connection.open()
+                except Exception as e:
+                    for waiting in messages[position + 1:]:
+                        outcomes[_failed(waiting, f'Connection failed: {e}')] += 1
+                    break
+            else:
+                sent_ids.append(message.pk)
+    finally:
+        connection.close()
+
+    OutboxMessage.objects.filter(pk__in=sent_ids).update(
+        status='sent', sent_at=timezone.now(), claim=None, last_error=''
+    )
+    return len(sent_ids), outcomes['pending'], outcomes['dead']
+
+
+def requeue_dead():
+    """Give dead-lettered messages a fresh set of attempts"""
+    return OutboxMessage.objects.filter(status='dead').update(
+        status='pending', attempts=0, next_attempt_at=timezone.now(), claim=None
+    )
@@ -0,0 +1,294 @@
+"""
+Pagination helpers shared by the public site and the dashboard.
+
+``KeysetPaginator`` walks a queryset by the values of its ordering columns
+instead of ``OFFSET``, so every page is a single indexed range scan and no
+``COUNT(*)`` is ever needed. Pages are addressed by opaque cursor tokens.
+
+``EstimatedCountPaginator`` keeps numbered pages for the dashboard lists
+but counts through ``approximate_count``: a large unfiltered table is
+counted by PostgreSQL's planner estimate, and every other count is cached
+briefly instead of re-run on each page view.
+"""
+import base64
+import datetime
+import decimal
+import hashlib
+import json
+import operator
+from functools import reduce
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+from .cache import get_version
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _cursor_value(value):
+    """JSON-encode a key value without losing precision (unlike DjangoJSONEncoder)"""
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return str(value)
+
+
+class KeysetPage:
+    """A page of results plus the cursors needed to reach its neighbours"""
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Cursor pagination over ``queryset`` ordered by ``ordering``.
+
+    ``ordering`` must end in a unique column (usually ``-id``) so that every
+    row has a distinct position; it should also match a composite index so
+    each page is an index range scan.
+    """
+
+    def __init__(self, queryset, per_page, ordering):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = list(ordering)
+        self.fields = [name.lstrip('-') for name in self.ordering]
+        self.descending = [name.startswith('-') for name in self.ordering]
+
+    def get_page(self, cursor=None):
+        """Return the page addressed by ``cursor``; invalid cursors give the first page"""
+        try:
+            direction, key = self.decode_cursor(cursor) if cursor else ('next', None)
+        except InvalidCursor:
+            direction, key = 'next', None
+
+        backwards = direction == 'previous'
+        queryset = self.queryset.order_by(*self._ordering(reverse=backwards))
+        if key is not None:
+            queryset = queryset.filter(self._after(key, reverse=backwards))
+
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if backwards:
+            rows.reverse()
+
+        if not rows:
+            return KeysetPage(rows)
+
+        if backwards:
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, key is not None
+
+        return KeysetPage(
+            rows,
+            next_cursor=self.encode_cursor('next', rows[-1]) if has_next else None,
+            previous_cursor=self.encode_cursor('previous', rows[0]) if has_previous else None,
+        )
+
+    def _ordering(self, reverse=False):
+        return [
+            ('-' if descending != reverse else '') + field
+            for field, descending in zip(self.fields, self.descending)
+        ]
+
+    def _after(self, key, reverse=False):
+        """Q matching rows strictly after ``key`` in the (possibly reversed) ordering"""
+        clauses = []
+        for i, (field, descending) in enumerate(zip(self.fields, self.descending)):
+            lookup = 'lt' if descending != reverse else 'gt'
+            conditions = {name: key[j] for j, name in enumerate(self.fields[:i])}
+            conditions[f'{field}__{lookup}'] = key[i]
+            clauses.append(Q(**conditions))
+        # The redundant bound on the leading column gives the planner an index range to scan
+        leading = 'lte' if self.descending[0] != reverse else 'gte'
+        return Q(**{f'{self.fields[0]}__{leading}': key[0]}) & reduce(operator.or_, clauses)
+
+    def encode_cursor(self, direction, obj):
+        if isinstance(obj, dict):
+            # Rows from .values()
+            values = [_cursor_value(obj[field]) for field in self.fields]
+        else:
+            values = [_cursor_value(getattr(obj, field)) for field in self.fields]
+        payload = json.dumps([direction[0], values], separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            direction, values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            if direction not in ('n', 'p') or len(values) != len(self.fields):
+                raise InvalidCursor(cursor)
+            model = self.queryset.model
+            key = [
+                model._meta.get_field(field).to_python(value)
+                for field, value in zip(self.fields, values)
+            ]
+        except InvalidCursor:
+            raise
+        except Exception as e:
+            raise InvalidCursor(cursor) from e
+        return ('next' if direction == 'n' else 'previous'), key
+
+
+# Unfiltered tables larger than this are counted by the planner's estimate
+ESTIMATE_THRESHOLD = getattr(settings, 'DASHBOARD_COUNT_ESTIMATE_THRESHOLD', 50000)
+COUNT_CACHE_TIMEOUT = getattr(settings, 'DASHBOARD_COUNT_CACHE_TIMEOUT', 60)
+
+
+def planner_estimate(model, using='default'):
+    """
+    PostgreSQL's estimate of the rows in ``model``'s table, from
+    ``pg_class.reltuples``. None on other databases and before the table
+    has been analyzed.
+    """
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [model._meta.db_table])
+        row = cursor.fetchone()
+    # -1 (or 0 before PostgreSQL 14) until autovacuum or ANALYZE has run
+    if row is None or row[0] <= 0:
+        return None
+    return row[0]
+
+
+def approximate_count(queryset, version=None):
+    """
+    ``(count, is_estimate)`` for ``queryset`` without a full ``COUNT(*)`` on
+    every call.
+
+    An unfiltered queryset on a table past ``ESTIMATE_THRESHOLD`` rows gets
+    the planner's estimate. Anything else is counted exactly and cached for
+    ``COUNT_CACHE_TIMEOUT`` seconds, keyed by its SQL and - when given - the
+    current value of the ``core.cache`` version ``version``, so writes that
+    bump it show up at once.
+    """
+    query = queryset.query
+    if not query.where and not query.distinct and not query.is_sliced and not query.combinator:
+        estimate = planner_estimate(queryset.model, queryset.db)
+        if estimate is not None and estimate >= ESTIMATE_THRESHOLD:
+            return estimate, True
+
+    try:
+        sql, params = query.sql_with_params()
+    except EmptyResultSet:
+        return 0, False
+    digest = hashlib.md5(f'{queryset.db}:{sql}:{params!r}'.encode()).hexdigest()
+    key = f'count:{get_version(version) if version else 0}:{digest}'
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, COUNT_CACHE_TIMEOUT)
+    return count, False
+
+
+class EstimatedCountPage(Page):
+
+    def __init__(self, object_list, number, paginator, more=None):
+        super().__init__(object_list, number, paginator)
+        # Whether rows follow this page, known when the count is an estimate
+        self.more = more
+
+    def has_next(self):
+        if self.more is None:
+            return super().has_next()
+        return self.more
+
+    def start_index(self):
+        if self.more is None or self.object_list:
+            return super().start_index()
+        return 0
+
+    def end_index(self):
+        if self.more is None:
+            return super().end_index()
+        if not self.object_list:
+            return 0
+        return self.start_index() + len(self.object_list) - 1
+
+    @property
+    def nearby_range(self):
+        """Page numbers up to two either side of this one"""
+        last = self.paginator.num_pages
+        if self.more is not None:
+            # The estimated last page can be too low or too high
+            last = self.number + 2 if self.more else self.number
+        return range(max(1, self.number - 2), min(last, self.number + 2) + 1)
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    ``Paginator`` counted by ``approximate_count``. While the count is an
+    estimate (``is_estimate``) it is only shown as the total: any page
+    number is accepted, each page fetches one row past its end to tell
+    whether another follows, and a page past the real end is simply
+    empty. The last page link is approximate too.
+    """
+
+    def __init__(self, object_list, per_page, version=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.version = version
+        self.is_estimate = False
+
+    @cached_property
+    def count(self):
+        count, self.is_estimate = approximate_count(self.object_list, self.version)
+        return count
+
+    def validate_number(self, number):
+        self.count
+        if not self.is_estimate:
+            return super().validate_number(number)
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger('That page number is not an integer')
+        if number < 1:
+            raise EmptyPage('That page number is less than 1')
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if not self.is_estimate:
+            return super().page(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        return EstimatedCountPage(rows[:self.per_page], number, self, more=len(rows) > self.per_page)
+
+    def _get_page(self, *args, **kwargs):
+        return EstimatedCountPage(*args, **kwargs)
@@ -0,0 +1,49 @@
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from clients.models import Client
+from products.models import Category, Product, ProductImage
+from quotes.models import QuoteRequest
+
+from . import funnel, stats
+from .cache import ANALYTICS, CATALOG, bump_version_on_commit
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+def invalidate_catalog_pages(sender, raw=False, **kwargs):
+    """Any catalog write retires every cached catalog page"""
+    if raw:
+        return
+    bump_version_on_commit(CATALOG)
+
+
+@receiver(post_save, sender=QuoteRequest)
+@receiver(post_save, sender=Client)
+def count_new_row(sender, instance, created, raw=False, **kwargs):
+    """Saves only - bulk inserts call stats.record themselves"""
+    if raw:
+        return
+    if created:
+        field = 'quotes' if sender is QuoteRequest else 'clients'
+        stats.record(stats.day_of(instance.created_at), **{field: 1})
+    elif sender is QuoteRequest:
+        # The status may have changed
+        bump_version_on_commit(ANALYTICS)
+
+
+@receiver(post_delete, sender=QuoteRequest)
+@receiver(post_delete, sender=Client)
+def uncount_deleted_row(sender, instance, **kwargs):
+    field = 'quotes' if sender is QuoteRequest else 'clients'
+    stats.record(stats.day_of(instance.created_at), **{field: -1})
+
+
+@receiver(pre_delete, sender=QuoteRequest)
+def forget_funnel_arrivals(sender, instance, **kwargs):
+    """While the quote's status history still exists"""
+    funnel.forget(instance)
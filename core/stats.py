@@ -0,0 +1,52 @@
+"""
+Daily rollup of new quotes and clients.
+
+The dashboard reads its totals and monthly trend from ``DailyStats`` - a
+few hundred rows - instead of counting and bucketing the quote and client
+tables on every load. Rows are adjusted with ``F()`` updates in the same
+transaction as the write they describe: quote saves and deletes through
+the signals in ``core.signals``, bulk inserts and ``upsert_client``
+explicitly. ``rebuild`` recomputes everything from the source tables.
+"""
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .cache import ANALYTICS, bump_version_on_commit
+from .models import DailyStats
+
+
+def record(day=None, quotes=0, clients=0):
+    """Add to (or, with negative numbers, take from) one day's totals"""
+    if not quotes and not clients:
+        return
+    day = day or timezone.localdate()
+    DailyStats.objects.bulk_create([DailyStats(date=day)], ignore_conflicts=True)
+    DailyStats.objects.filter(date=day).update(
+        quotes=F('quotes') + quotes,
+        clients=F('clients') + clients,
+    )
+    # Cached analytics counted the old totals
+    bump_version_on_commit(ANALYTICS)
+
+
+def day_of(created_at):
+    return timezone.localdate(created_at) if created_at else None
+
+
+def rebuild(DailyStats, QuoteRequest, Client):
+    """
+    Recompute every day from the quote and client tables. Models are passed
+    in so migrations can use their historical versions. Returns the number
+    of days written.
+    """
+    days = {}
+    for field, model in (('quotes', QuoteRequest), ('clients', Client)):
+        per_day = model.objects.annotate(day=TruncDate('created_at')).values('day').annotate(total=Count('id'))
+        for row in per_day:
+            days.setdefault(row['day'], {'quotes': 0, 'clients': 0})[field] = row['total']
+    with transaction.atomic():
+        DailyStats.objects.all().delete()
+        DailyStats.objects.bulk_create([DailyStats(date=day, **totals) for day, totals in days.items()])
+    return len(days)
@@ -1,14 +1,19 @@
 from django.shortcuts import render
 from django.core.mail import send_mail
 from django.contrib import messages
-from django.shortcuts import redirect
+from django.shortcuts import redirect, resolve_url
+from django.db import transaction
 from products.models import Product
+from . import idempotency
+from .cache import cache_catalog_page
 from .forms import ContactForm
+from .outbox import enqueue
 
 
+@cache_catalog_page
 def home(request):
     """Homepage view with featured products"""
-    featured_products = Product.objects.filter(is_featured=True)[:6]
+    featured_products = Product.objects.filter(is_featured=True).select_related('category')[:6]
     context = {
         'featured_products': featured_products,
         'business_name': 'Tecky Collections',
@@ -31,6 +36,11 @@ def about(request):
 def contact(request):
     """Contact page view with form"""
     if request.method == 'POST':
+        # A retried submission gets the original answer without queueing another email
+        replayed = idempotency.replayed_redirect(request)
+        if replayed:
+            return idempotency.replay_response(request, replayed)
+        
         form = ContactForm(request.POST)
         if form.is_valid():
             # Process the contact form
@@ -39,14 +49,27 @@ def contact(request):
             phone = form.cleaned_data['phone']
             message = form.cleaned_data['message']
             
-            # You can add email sending logic here
+            success_url = resolve_url('core:contact')
+            try:
+                with transaction.atomic():
+                    idempotency.record(request, success_url)
+                    # Queued for the drain_outbox worker - no SMTP in the request
+                    enqueue(
+                        'contact',
+                        f'Contact form message from {name}',
+                        f'{message}\n\nFrom: {name}\nEmail: {email}\nPhone: {phone}',
+                        reply_to=email,
+                    )
+            except idempotency.Replayed as replay:
+                return idempotency.replay_response(request, replay.redirect_to)
             messages.success(request, 'Thank you for your message! We will get back to you soon.')
-            return redirect('core:contact')
+            return redirect(success_url)
     else:
         form = ContactForm()
     
     context = {
         'form': form,
+        'idempotency_key': idempotency.form_key(request),
         'business_name': 'Tecky Collections',
         'phone': '0723835202',
         'email': 'teckycollections@gmail.com',
@@ -1,16 +1,33 @@
 from django.contrib import admin
-from .models import Category, Product
+from django.db.models import Max
+from django.utils.html import format_html
+from .forms import ProductAdminForm
+from .models import Category, Product, ProductImage
 
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
-    list_display = ['name', 'slug', 'created_at']
+    list_display = ['name', 'slug', 'product_count', 'featured_count', 'created_at']
     prepopulated_fields = {'slug': ('name',)}
     search_fields = ['name']
 
 
+class ProductImageInline(admin.TabularInline):
+    model = ProductImage
+    extra = 0
+    fields = ['preview', 'image', 'image_url', 'position']
+    readonly_fields = ['preview']
+    
+    def preview(self, obj):
+        if not obj.thumbnail_url:
+            return '-'
+        return format_html('<img src="{}" style="height: 60px;">', obj.thumbnail_url)
+
+
 @admin.register(Product)
 class ProductAdmin(admin.ModelAdmin):
+    form = ProductAdminForm
+    inlines = [ProductImageInline]
     list_display = ['name', 'category', 'date_completed', 'is_featured', 'created_at']
     list_filter = ['category', 'is_featured', 'date_completed', 'created_at']
     search_fields = ['name', 'description']
@@ -23,10 +40,21 @@ class ProductAdmin(admin.ModelAdmin):
             'fields': ('name', 'slug', 'category', 'description')
         }),
         ('Images', {
-            'fields': ('image', 'additional_images'),
-            'description': 'Upload main image and add additional image URLs (one per line)'
+            'fields': ('image', 'gallery_upload'),
+            'description': 'Upload the main image and any number of gallery images at once. '
+                           'Reorder or remove gallery images in the table below.'
         }),
         ('Details', {
             'fields': ('date_completed', 'is_featured')
         }),
-    )
\ No newline at end of file
+    )
+    
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        uploads = form.cleaned_data.get('gallery_upload') or []
+        if uploads:
+            product = form.instance
+            last_position = product.images.aggregate(last=Max('position'))['last']
+            start = 0 if last_position is None else last_position + 1
+            for offset, upload in enumerate(uploads):
+                ProductImage.objects.create(product=product, image=upload, position=start + offset)
@@ -0,0 +1,179 @@
+"""
+Read-only JSON catalog API for lightweight clients.
+
+Every response carries an ETag derived from the newest ``updated_at`` (and
+row count) of the rows it covers. Clients that send it back in
+``If-None-Match`` get a bodiless 304, decided by one aggregate query before
+anything is serialized.
+
+    GET /products/api/categories/
+    GET /products/api/products/?category=<slug>&limit=20&cursor=<token>&fields=name,slug
+    GET /products/api/products/<slug>/
+
+``fields`` picks a subset of the documented fields.
+"""
+import hashlib
+
+from django.core.files.storage import default_storage
+from django.db.models import Count, Max
+from django.http import Http404, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition, require_GET
+
+from core.pagination import KeysetPaginator
+from .models import Category, Product, ProductImage
+
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+# Public field name -> ORM path read with .values()
+CATEGORY_FIELDS = {
+    'id': 'id',
+    'name': 'name',
+    'slug': 'slug',
+    'description': 'description',
+    'product_count': 'product_count',
+    'featured_count': 'featured_count',
+    'updated_at': 'updated_at',
+}
+
+PRODUCT_FIELDS = {
+    'id': 'id',
+    'name': 'name',
+    'slug': 'slug',
+    'category': 'category__slug',
+    'description': 'description',
+    'date_completed': 'date_completed',
+    'is_featured': 'is_featured',
+    'image': 'image',
+    'image_width': 'image_width',
+    'image_height': 'image_height',
+    'thumbnail': 'image_variants',
+    'updated_at': 'updated_at',
+}
+
+DEFAULT_PRODUCT_FIELDS = [
+    'id', 'name', 'slug', 'category', 'date_completed', 'is_featured', 'thumbnail', 'updated_at',
+]
+
+
+def _selected_fields(request, available, default=None):
+    requested = [name.strip() for name in request.GET.get('fields', '').split(',') if name.strip()]
+    selected = [name for name in requested if name in available]
+    return selected or list(default or available)
+
+
+def _limit(request):
+    try:
+        return max(1, min(int(request.GET.get('limit', DEFAULT_LIMIT)), MAX_LIMIT))
+    except ValueError:
+        return DEFAULT_LIMIT
+
+
+def _etag(request, *parts):
+    """Fingerprint of the underlying rows plus everything in the query string"""
+    query = '&'.join(f'{key}={value}' for key, value in sorted(request.GET.items()))
+    raw = '|'.join(str(part) for part in (*parts, query))
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def _product_queryset(request):
+    products = Product.objects.all()
+    category_slug = request.GET.get('category')
+    if category_slug:
+        products = products.filter(category__slug=category_slug)
+    return products
+
+
+def _product_json(row, fields):
+    data = {}
+    for name in fields:
+        value = row[PRODUCT_FIELDS[name]]
+        if name == 'image':
+            value = default_storage.url(value) if value else None
+        elif name == 'thumbnail':
+            thumb = (value or {}).get('variants', {}).get('thumb')
+            value = default_storage.url(thumb['jpeg']) if thumb else None
+        data[name] = value
+    return data
+
+
+def _json(data):
+    response = JsonResponse(data)
+    # Always revalidate - a 304 is nearly free
+    patch_cache_control(response, max_age=0, must_revalidate=True)
+    return response
+
+
+def categories_etag(request):
+    stats = Category.objects.aggregate(updated=Max('updated_at'), count=Count('id'))
+    return _etag(request, stats['updated'], stats['count'])
+
+
+def products_etag(request):
+    stats = _product_queryset(request).aggregate(
+        updated=Max('updated_at'),
+        category_updated=Max('category__updated_at'),
+        count=Count('id'),
+    )
+    return _etag(request, stats['updated'], stats['category_updated'], stats['count'])
+
+
+def product_etag(request, slug):
+    row = Product.objects.filter(slug=slug).values('updated_at', 'category__updated_at').first()
+    if row is None:
+        raise Http404('No product matches the given query.')
+    return _etag(request, slug, row['updated_at'], row['category__updated_at'])
+
+
+@require_GET
+@condition(etag_func=categories_etag)
+def category_list(request):
+    """All categories - there are only a handful, so no pagination"""
+    fields = _selected_fields(request, CATEGORY_FIELDS)
+    rows = Category.objects.values(*[CATEGORY_FIELDS[name] for name in fields])
+    return _json({'results': list(rows)})
+
+
+@require_GET
+@condition(etag_func=products_etag)
+def product_list(request):
+    """Products newest first, paginated with cursors"""
+    fields = _selected_fields(request, PRODUCT_FIELDS, DEFAULT_PRODUCT_FIELDS)
+    ordering = Product._meta.ordering
+    columns = {PRODUCT_FIELDS[name] for name in fields} | {name.lstrip('-') for name in ordering}
+    rows = _product_queryset(request).values(*columns)
+
+    page = KeysetPaginator(rows, _limit(request), ordering).get_page(request.GET.get('cursor'))
+
+    def page_url(cursor):
+        if cursor is None:
+            return None
+        params = request.GET.copy()
+        params['cursor'] = cursor
+        return request.build_absolute_uri(f'{reverse("products:api_products")}?{params.urlencode()}')
+
+    return _json({
+        'results': [_product_json(row, fields) for row in page],
+        'next': page_url(page.next_cursor),
+        'previous': page_url(page.previous_cursor),
+    })
+
+
+@require_GET
+@condition(etag_func=product_etag)
+def product_detail(request, slug):
+    """One product, including its gallery"""
+    fields = _selected_fields(request, PRODUCT_FIELDS)
+    row = get_object_or_404(
+        Product.objects.values(*{PRODUCT_FIELDS[name] for name in fields} | {'id'}), slug=slug
+    )
+    data = _product_json(row, fields)
+    data['gallery'] = [
+        {'url': image.url, 'thumbnail': image.thumbnail_url or image.url, 'width': image.width, 'height': image.height}
+        for image in ProductImage.objects.filter(product_id=row['id'])
+    ]
+    return _json(data)
@@ -0,0 +1,57 @@
+"""
+Denormalized per-category product counts.
+
+``Category.product_count`` and ``featured_count`` let the category filter bars
+show facet counts straight from the rows they already load. Product signals
+keep them in step with atomic ``F()`` updates; ``reconcile`` recomputes them
+from the products table for anything that bypasses signals.
+"""
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from .models import Category, Product
+
+
+def adjust(category_id, products=0, featured=0):
+    """Add the given deltas to one category's counts"""
+    if not category_id or not (products or featured):
+        return
+    Category.objects.filter(pk=category_id).update(
+        product_count=F('product_count') + products,
+        featured_count=F('featured_count') + featured,
+        # Cached pages and API ETags key off updated_at
+        updated_at=timezone.now(),
+    )
+
+
+def reconcile(category_ids=None):
+    """Recount from the products table. Returns the number of categories corrected"""
+    actual = {
+        row['category']: (row['products'], row['featured'])
+        for row in Product.objects.order_by().values('category').annotate(
+            products=Count('id'), featured=Count('id', filter=Q(is_featured=True))
+        )
+    }
+    categories = Category.objects.all()
+    if category_ids is not None:
+        categories = categories.filter(pk__in=category_ids)
+
+    corrected = 0
+    for category_id, product_count, featured_count in categories.values_list(
+        'id', 'product_count', 'featured_count'
+    ):
+        counts = actual.get(category_id, (0, 0))
+        if counts != (product_count, featured_count):
+            Category.objects.filter(pk=category_id).update(
+                product_count=counts[0], featured_count=counts[1], updated_at=timezone.now()
+            )
+            corrected += 1
+    return corrected
+
+
+def totals(categories):
+    """Catalog-wide counts summed from already loaded categories"""
+    return {
+        'products': sum(category.product_count for category in categories),
+        'featured': sum(category.featured_count for category in categories),
+    }
@@ -0,0 +1,32 @@
+from django import forms
+from .models import Product
+
+
+class MultipleFileInput(forms.ClearableFileInput):
+    allow_multiple_selected = True
+
+
+class MultipleImageField(forms.ImageField):
+    """ImageField accepting several files from one <input multiple>"""
+    
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('widget', MultipleFileInput(attrs={'accept': 'image/*'}))
+        super().__init__(*args, **kwargs)
+    
+    def clean(self, data, initial=None):
+        single_clean = super().clean
+        if isinstance(data, (list, tuple)):
+            return [single_clean(item, initial) for item in data]
+        return [single_clean(data, initial)] if data else []
+
+
+class ProductAdminForm(forms.ModelForm):
+    gallery_upload = MultipleImageField(
+        required=False,
+        label="Add gallery images",
+        help_text="Select several files at once; they are appended to the gallery in order"
+    )
+    
+    class Meta:
+        model = Product
+        fields = '__all__'
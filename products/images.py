@@ -0,0 +1,186 @@
+"""
+Responsive image variants for product photos.
+
+Every uploaded ``Product.image`` is resized once into a small set of widths
+and re-encoded as WebP and JPEG. The results are written next to the
+original under ``products/variants/`` and described on the product in
+``Product.image_variants`` so templates never have to touch Pillow.
+"""
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+
+# Variant name -> target width in pixels
+VARIANT_WIDTHS = {
+    'thumb': 320,
+    'card': 640,
+    'full': 1280,
+}
+
+VARIANT_FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+VARIANTS_DIR = 'products/variants'
+GALLERY_THUMBNAILS_DIR = 'products/gallery/thumbnails'
+
+
+def _to_rgb(image):
+    """Load ``image`` and flatten it onto white so it can be saved as JPEG"""
+    image.load()
+    if image.mode == 'RGB':
+        return image
+    if image.mode in ('RGBA', 'LA') or 'transparency' in image.info:
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.split()[-1])
+        return background
+    return image.convert('RGB')
+
+
+def variant_name(image_name, variant, fmt):
+    """Return the storage path of one variant of ``image_name``"""
+    stem = os.path.splitext(os.path.basename(image_name))[0]
+    extension = 'jpg' if fmt == 'jpeg' else fmt
+    return f'{VARIANTS_DIR}/{stem}-{variant}.{extension}'
+
+
+def build_variants(image_name, storage=None):
+    """
+    Generate all variants for the stored image ``image_name``.
+
+    Returns the dictionary stored on ``Product.image_variants``. It is safe
+    to call from a worker process: it only touches storage, never the
+    database.
+    """
+    storage = storage or default_storage
+    with storage.open(image_name, 'rb') as source:
+        original = _to_rgb(ImageOps.exif_transpose(Image.open(source)))
+
+    source_width, source_height = original.size
+    variants = {}
+    for variant, target_width in VARIANT_WIDTHS.items():
+        # Never upscale - small uploads just get re-encoded
+        width = min(target_width, source_width)
+        height = max(1, round(source_height * width / source_width))
+        resized = original if width == source_width else original.resize(
+            (width, height), Image.LANCZOS
+        )
+
+        entry = {'width': width, 'height': height}
+        for fmt, (pil_format, save_options) in VARIANT_FORMATS.items():
+            buffer = BytesIO()
+            resized.save(buffer, pil_format, **save_options)
+            name = variant_name(image_name, variant, fmt)
+            if storage.exists(name):
+                storage.delete(name)
+            entry[fmt] = storage.save(name, ContentFile(buffer.getvalue()))
+        variants[variant] = entry
+
+    return {
+        'source': image_name,
+        'width': source_width,
+        'height': source_height,
+        'variants': variants,
+    }
+
+
+def thumbnail_name(image_name):
+    """Return the storage path of the gallery thumbnail of ``image_name``"""
+    stem = os.path.splitext(os.path.basename(image_name))[0]
+    return f'{GALLERY_THUMBNAILS_DIR}/{stem}.jpg'
+
+
+def build_thumbnail(image_name, storage=None):
+    """Write a ``thumb``-width JPEG of ``image_name`` and return its storage path"""
+    storage = storage or default_storage
+    with storage.open(image_name, 'rb') as source:
+        image = _to_rgb(ImageOps.exif_transpose(Image.open(source)))
+
+    width = min(VARIANT_WIDTHS['thumb'], image.width)
+    height = max(1, round(image.height * width / image.width))
+    if width != image.width:
+        image = image.resize((width, height), Image.LANCZOS)
+
+    pil_format, save_options = VARIANT_FORMATS['jpeg']
+    buffer = BytesIO()
+    image.save(buffer, pil_format, **save_options)
+    name = thumbnail_name(image_name)
+    if storage.exists(name):
+        storage.delete(name)
+    return storage.save(name, ContentFile(buffer.getvalue()))
+
+
+def variant_files(image_variants):
+    """Return the set of storage paths referenced by ``image_variants``"""
+    return {
+        entry[fmt]
+        for entry in (image_variants or {}).get('variants', {}).values()
+        for fmt in VARIANT_FORMATS
+        if entry.get(fmt)
+    }
+
+
+def delete_variants(image_variants, keep=None, storage=None):
+    """Remove previously generated variant files, except those in ``keep``"""
+    storage = storage or default_storage
+    for name in variant_files(image_variants) - variant_files(keep):
+        if storage.exists(name):
+            storage.delete(name)
+
+
+def variants_are_current(product):
+    """True when ``product.image_variants`` describes the current image"""
+    if not product.image:
+        return not product.image_variants
+    return product.image_variants.get('source') == product.image.name
+
+
+def refresh_variants(product):
+    """
+    (Re)build variants for ``product`` if its image changed since the last run.
+
+    Writes the result with a queryset ``update()`` so ``post_save`` handlers
+    are not re-triggered. Returns True when anything was written.
+    """
+    from .models import Product
+
+    if variants_are_current(product):
+        return False
+
+    old_variants = product.image_variants
+    if product.image:
+        image_variants = build_variants(product.image.name)
+        width, height = image_variants['width'], image_variants['height']
+    else:
+        image_variants, width, height = {}, None, None
+
+    # update() skips auto_now; the API ETags follow updated_at
+    Product.objects.filter(pk=product.pk).update(
+        image_variants=image_variants,
+        image_width=width,
+        image_height=height,
+        updated_at=timezone.now(),
+    )
+    product.image_variants = image_variants
+    product.image_width = width
+    product.image_height = height
+
+    delete_variants(old_variants, keep=image_variants)
+    return True
+
+
+def srcset(image_variants, fmt):
+    """Build a ``srcset`` attribute value for one format"""
+    entries = (image_variants or {}).get('variants', {}).values()
+    # Small uploads can produce several variants of the same width
+    candidates = {entry['width']: entry[fmt] for entry in entries if entry.get(fmt)}
+    return ', '.join(
+        f'{default_storage.url(name)} {width}w' for width, name in sorted(candidates.items())
+    )
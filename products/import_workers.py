@@ -0,0 +1,75 @@
+"""
+Image work for ``import_catalog``, run in a pool of spawned processes.
+
+Kept apart from the command so a worker can import it before Django is set
+up - nothing here touches models or the database, only storage. Each
+worker opens the ZIP archive once, in ``init_worker``, instead of
+re-reading its directory for every image.
+"""
+import io
+import os
+import zipfile
+from pathlib import Path
+
+import django
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image
+
+from .images import build_thumbnail, build_variants
+
+
+# The worker process's open ZIP archive, or None when images are on disk
+_archive = None
+
+
+def init_worker(archive):
+    """Executor initializer: set up Django and open the archive once per process"""
+    global _archive
+    django.setup()
+    if archive:
+        _archive = zipfile.ZipFile(archive)
+
+
+def _read_source(path):
+    """Read an image from the worker's ZIP archive, or from disk without one"""
+    if _archive:
+        return _archive.read(path)
+    return Path(path).read_bytes()
+
+
+def _read_image(path):
+    """Read an image and check that Pillow can decode it"""
+    data = _read_source(path)
+    with Image.open(io.BytesIO(data)) as image:
+        image.verify()
+    return data
+
+
+def check_image(path):
+    """Worker entry point for --dry-run: validate one image, store nothing"""
+    try:
+        _read_image(path)
+        return {}
+    except Exception as e:
+        return {'error': f'{path}: {e}'}
+
+
+def process_image(path, upload_to, kind):
+    """
+    Worker entry point: validate, store and derive one image.
+
+    Runs in a separate process so Pillow work is spread over all cores; it
+    only touches storage, never the database.
+    """
+    try:
+        data = _read_image(path)
+        name = default_storage.save(f'{upload_to}/{os.path.basename(path)}', ContentFile(data))
+        if kind == 'main':
+            return {'name': name, 'variants': build_variants(name)}
+        with Image.open(io.BytesIO(data)) as image:
+            width, height = image.size
+        thumbnail = build_thumbnail(name)
+        return {'name': name, 'width': width, 'height': height, 'thumbnail_url': default_storage.url(thumbnail)}
+    except Exception as e:
+        return {'error': f'{path}: {e}'}
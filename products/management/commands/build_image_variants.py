@@ -0,0 +1,83 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.utils import timezone
+
+from core.cache import CATALOG, bump_version
+from products.images import build_variants, delete_variants
+from products.models import Product
+
+
+def _build(product_id, image_name):
+    """Worker entry point - image work only, results go back to the parent"""
+    try:
+        return product_id, build_variants(image_name), None
+    except Exception as e:
+        return product_id, None, str(e)
+
+
+class Command(BaseCommand):
+    help = 'Generate responsive image variants for existing products'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 1,
+            help='Number of worker processes (default: number of CPU cores)'
+        )
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Rebuild variants even if they are already up to date'
+        )
+
+    def handle(self, *args, **options):
+        products = Product.objects.exclude(image='').exclude(image__isnull=True)
+        jobs = {}
+        for product in products.only('id', 'image', 'image_variants'):
+            if options['force'] or product.image_variants.get('source') != product.image.name:
+                jobs[product.id] = product
+
+        if not jobs:
+            self.stdout.write('All product images are up to date')
+            return
+
+        self.stdout.write(f'Building variants for {len(jobs)} products with {options["workers"]} workers...')
+        started = time.monotonic()
+
+        # Worker processes are forked - don't let them inherit open DB connections
+        connections.close_all()
+
+        built = failed = 0
+        with ProcessPoolExecutor(max_workers=options['workers']) as executor:
+            futures = [
+                executor.submit(_build, product.id, product.image.name)
+                for product in jobs.values()
+            ]
+            for future in as_completed(futures):
+                product_id, image_variants, error = future.result()
+                product = jobs[product_id]
+                if error:
+                    failed += 1
+                    self.stderr.write(f'{product.image.name}: {error}')
+                    continue
+
+                # update() skips auto_now; the API ETags follow updated_at
+                Product.objects.filter(pk=product_id).update(
+                    image_variants=image_variants,
+                    image_width=image_variants['width'],
+                    image_height=image_variants['height'],
+                    updated_at=timezone.now(),
+                )
+                delete_variants(product.image_variants, keep=image_variants)
+                built += 1
+
+        if built:
+            # Variants are written with update(), which doesn't fire the invalidation signals
+            bump_version(CATALOG)
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            self.style.SUCCESS(f'Built variants for {built} products in {elapsed:.1f}s ({failed} failed)')
+        )
@@ -0,0 +1,51 @@
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+
+from products.related import build_all, refresh_queued
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild the precomputed related-products table, or with --watch keep '
+        're-scoring the products queued by saves until stopped.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--watch', action='store_true',
+            help='Re-score queued products instead of rebuilding everything, until stopped'
+        )
+        parser.add_argument(
+            '--poll', type=float, default=10.0,
+            help='Seconds to wait before checking an empty queue again'
+        )
+
+    def handle(self, *args, **options):
+        if options['watch']:
+            return self.watch(options['poll'])
+
+        started = time.monotonic()
+        products, rows = build_all()
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            self.style.SUCCESS(f'Stored {rows} related entries for {products} products in {elapsed:.1f}s')
+        )
+
+    def watch(self, poll):
+        self.running = True
+
+        def stop(*args):
+            self.running = False
+        signal.signal(signal.SIGTERM, stop)
+
+        try:
+            while self.running:
+                refreshed = refresh_queued()
+                if refreshed:
+                    self.stdout.write(f'Re-scored related products for {refreshed} changed products')
+                else:
+                    time.sleep(poll)
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,323 @@
+import csv
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import time
+import zipfile
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils.text import slugify
+
+from core.cache import CATALOG, bump_version
+from products import counts, related
+from products.import_workers import check_image, init_worker, process_image
+from products.models import Category, Product, ProductImage
+from products.search import index_products
+
+
+GALLERY_SEPARATOR = '|'
+
+
+class RowError(ValueError):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Import products from a CSV file or a ZIP archive holding a CSV plus images. '
+        'Columns: name, category, description, date_completed (YYYY-MM-DD), and optionally '
+        'slug, is_featured, image, gallery (several entries separated by "|"; file names or URLs).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('source', help='Path to a .csv or .zip file')
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 1,
+            help='Image processing processes (default: number of CPU cores)'
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Validate everything, write nothing')
+        parser.add_argument('--restart', action='store_true', help='Ignore any saved checkpoint')
+
+    def handle(self, *args, **options):
+        source = Path(options['source']).resolve()
+        if not source.exists():
+            raise CommandError(f'{source} does not exist')
+
+        self.dry_run = options['dry_run']
+        self.archive = str(source) if zipfile.is_zipfile(source) else None
+        self.base_dir = source.parent
+        self.checkpoint_path = source.with_name(source.name + '.checkpoint.json')
+        self.fingerprint = self.source_fingerprint(source)
+
+        start_row = 0 if options['restart'] or self.dry_run else self.load_checkpoint()
+        if start_row:
+            self.stdout.write(f'Resuming after row {start_row}')
+
+        # Everything the rows are resolved against, loaded once
+        self.categories = dict(Category.objects.values_list('name', 'id'))
+        self.slugs = set(Product.objects.values_list('slug', flat=True))
+        self.category_slugs = set(Category.objects.values_list('slug', flat=True))
+
+        self.stats = {'created': 0, 'skipped': 0, 'duplicates': 0, 'failed': 0, 'images': 0, 'bad_images': 0}
+        # Row number each slug in this file first appeared on
+        self.file_slugs = {}
+        self.created_ids = []
+        started = time.monotonic()
+
+        # Spawned (not forked) workers never share the parent's DB connections
+        executor = ProcessPoolExecutor(
+            max_workers=options['workers'],
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=init_worker,
+            initargs=(self.archive,),
+        )
+        try:
+            row_number = 0
+            batch = []
+            for row_number, row in enumerate(self.rows(source), start=1):
+                if row_number <= start_row:
+                    continue
+                batch.append((row_number, row))
+                if len(batch) >= options['batch_size']:
+                    self.import_batch(batch, executor)
+                    self.report(row_number, started)
+                    batch = []
+            if batch:
+                self.import_batch(batch, executor)
+            self.report(row_number, started)
+        finally:
+            executor.shutdown()
+
+        if self.dry_run:
+            self.stdout.write(self.style.SUCCESS(
+                f'Dry run: {self.stats["created"]} products would be created, '
+                f'{self.stats["skipped"]} skipped, {self.stats["duplicates"]} duplicated in the file, '
+                f'{self.stats["failed"]} invalid; {self.stats["images"]} images valid, '
+                f'{self.stats["bad_images"]} missing or invalid'
+            ))
+            return
+
+        # A resumed run may create nothing, but the run it continues never got this far
+        if self.created_ids or start_row:
+            self.stdout.write('Refreshing related products...')
+            related.build_all()
+            bump_version(CATALOG)
+        if self.checkpoint_path.exists():
+            self.checkpoint_path.unlink()
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {self.stats["created"]} products and {self.stats["images"]} images in {elapsed:.1f}s '
+            f'({self.stats["skipped"]} skipped, {self.stats["duplicates"]} duplicated in the file, '
+            f'{self.stats["failed"]} failed, {self.stats["bad_images"]} images failed)'
+        ))
+
+    # Input
+
+    def rows(self, source):
+        if self.archive:
+            with zipfile.ZipFile(self.archive) as zf:
+                csv_names = [name for name in zf.namelist() if name.lower().endswith('.csv')]
+                if not csv_names:
+                    raise CommandError('The archive contains no CSV file')
+                with zf.open(csv_names[0]) as raw:
+                    yield from csv.DictReader(io.TextIOWrapper(raw, encoding='utf-8-sig'))
+        else:
+            with open(source, newline='', encoding='utf-8-sig') as f:
+                yield from csv.DictReader(f)
+
+    def source_fingerprint(self, source):
+        stat = source.stat()
+        return hashlib.sha1(f'{source}|{stat.st_size}|{stat.st_mtime_ns}'.encode()).hexdigest()
+
+    def load_checkpoint(self):
+        if not self.checkpoint_path.exists():
+            return 0
+        checkpoint = json.loads(self.checkpoint_path.read_text())
+        if checkpoint.get('fingerprint') != self.fingerprint:
+            self.stdout.write(self.style.WARNING('Source changed since the checkpoint was written, starting over'))
+            return 0
+        return checkpoint['rows']
+
+    def save_checkpoint(self, rows):
+        self.checkpoint_path.write_text(json.dumps({'fingerprint': self.fingerprint, 'rows': rows}))
+
+    def image_path(self, value):
+        return value if self.archive else str(self.base_dir / value)
+
+    # Rows
+
+    def parse(self, row):
+        name = (row.get('name') or '').strip()
+        category = (row.get('category') or '').strip()
+        description = (row.get('description') or '').strip()
+        if not (name and category and description):
+            raise RowError('name, category and description are required')
+        try:
+            completed = date.fromisoformat((row.get('date_completed') or '').strip())
+        except ValueError:
+            raise RowError(f'bad date_completed {row.get("date_completed")!r}')
+
+        gallery = [
+            item.strip() for item in (row.get('gallery') or '').split(GALLERY_SEPARATOR) if item.strip()
+        ]
+        return {
+            'name': name,
+            'slug': slugify((row.get('slug') or '').strip() or name),
+            'category': category,
+            'description': description,
+            'date_completed': completed,
+            'is_featured': (row.get('is_featured') or '').strip().lower() in ('1', 'true', 'yes', 'y'),
+            'image': (row.get('image') or '').strip(),
+            'gallery': gallery,
+        }
+
+    def resolve_categories(self, names):
+        """Create any categories not seen yet with one bulk insert"""
+        missing = sorted(set(names) - set(self.categories))
+        if not missing:
+            return
+        new_categories = []
+        for name in missing:
+            slug = base = slugify(name)
+            suffix = 2
+            while slug in self.category_slugs:
+                slug, suffix = f'{base}-{suffix}', suffix + 1
+            self.category_slugs.add(slug)
+            new_categories.append(Category(name=name, slug=slug))
+        if self.dry_run:
+            for category in new_categories:
+                self.categories[category.name] = None
+            return
+        for category in Category.objects.bulk_create(new_categories):
+            self.categories[category.name] = category.id
+
+    def import_batch(self, batch, executor):
+        parsed = []
+        for row_number, row in batch:
+            try:
+                item = self.parse(row)
+            except RowError as e:
+                self.stats['failed'] += 1
+                self.stderr.write(f'Row {row_number}: {e}')
+                continue
+            # Two rows of one file claiming a slug is a mistake in the file
+            first_row = self.file_slugs.get(item['slug'])
+            if first_row:
+                self.stats['duplicates'] += 1
+                self.stderr.write(f'Row {row_number}: slug {item["slug"]!r} duplicates row {first_row} of this file')
+                continue
+            self.file_slugs[item['slug']] = row_number
+            # The slug is the product's identity - re-imports skip what already exists
+            if item['slug'] in self.slugs:
+                self.stats['skipped'] += 1
+                continue
+            parsed.append(item)
+
+        self.resolve_categories(item['category'] for item in parsed)
+        if self.dry_run:
+            self.check_images(parsed, executor)
+            self.stats['created'] += len(parsed)
+            return
+
+        # Images first, in parallel - rows then carry their final file names
+        main_jobs = {
+            index: executor.submit(process_image, self.image_path(item['image']), 'products', 'main')
+            for index, item in enumerate(parsed) if item['image']
+        }
+        gallery_jobs = {
+            (index, position): executor.submit(
+                process_image, self.image_path(entry), 'products/gallery', 'gallery'
+            )
+            for index, item in enumerate(parsed)
+            for position, entry in enumerate(item['gallery'])
+            if '://' not in entry
+        }
+
+        products = []
+        for index, item in enumerate(parsed):
+            product = Product(
+                name=item['name'],
+                slug=item['slug'],
+                category_id=self.categories[item['category']],
+                description=item['description'],
+                date_completed=item['date_completed'],
+                is_featured=item['is_featured'],
+            )
+            if index in main_jobs:
+                result = main_jobs[index].result()
+                if 'error' in result:
+                    self.stats['bad_images'] += 1
+                    self.stderr.write(result['error'])
+                else:
+                    product.image = result['name']
+                    product.image_variants = result['variants']
+                    product.image_width = result['variants']['width']
+                    product.image_height = result['variants']['height']
+                    self.stats['images'] += 1
+            products.append(product)
+
+        gallery = []
+        for index, item in enumerate(parsed):
+            for position, entry in enumerate(item['gallery']):
+                image = ProductImage(position=position)
+                if (index, position) in gallery_jobs:
+                    result = gallery_jobs[index, position].result()
+                    if 'error' in result:
+                        self.stats['bad_images'] += 1
+                        self.stderr.write(result['error'])
+                        continue
+                    image.image = result['name']
+                    image.width, image.height = result['width'], result['height']
+                    image.thumbnail_url = result['thumbnail_url']
+                    self.stats['images'] += 1
+                else:
+                    image.image_url = image.thumbnail_url = entry
+                gallery.append((index, image))
+
+        with transaction.atomic():
+            Product.objects.bulk_create(products)
+            for index, image in gallery:
+                image.product_id = products[index].id
+            ProductImage.objects.bulk_create([image for _, image in gallery])
+            # bulk_create skips save() and its signals - index and count the batch here
+            index_products(product.id for product in products)
+            added = Counter(product.category_id for product in products)
+            featured = Counter(product.category_id for product in products if product.is_featured)
+            for category_id, number in added.items():
+                counts.adjust(category_id, number, featured[category_id])
+        # Only once the batch has committed - a resumed run must not skip a rolled-back batch
+        self.save_checkpoint(batch[-1][0])
+
+        self.created_ids.extend(product.id for product in products)
+        self.stats['created'] += len(products)
+
+    def check_images(self, parsed, executor):
+        """--dry-run: every referenced file must exist and decode"""
+        paths = [
+            self.image_path(entry)
+            for item in parsed
+            for entry in ([item['image']] if item['image'] else []) + item['gallery']
+            if '://' not in entry
+        ]
+        for result in executor.map(check_image, paths):
+            if 'error' in result:
+                self.stats['bad_images'] += 1
+                self.stderr.write(result['error'])
+            else:
+                self.stats['images'] += 1
+
+    def report(self, rows, started):
+        elapsed = max(time.monotonic() - started, 1e-6)
+        self.stdout.write(
+            f'{rows} rows read, {self.stats["created"]} products, {self.stats["images"]} images - '
+            f'{self.stats["created"] / elapsed:.1f} products/s, {self.stats["images"] / elapsed:.1f} images/s'
+        )
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from products.counts import reconcile
+
+
+class Command(BaseCommand):
+    help = 'Recount the denormalized product and featured counts on every category'
+
+    def handle(self, *args, **options):
+        corrected = reconcile()
+        self.stdout.write(self.style.SUCCESS(f'{corrected} categories corrected'))
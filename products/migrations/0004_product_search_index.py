@@ -0,0 +1,61 @@
+from django.db import migrations
+
+
+PG_VECTOR_SQL = """
+    setweight(to_tsvector('english', coalesce(p.name, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce(c.name, '')), 'B') ||
+    setweight(to_tsvector('english', coalesce(p.description, '')), 'C')
+"""
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        schema_editor.execute('ALTER TABLE products_product ADD COLUMN search_vector tsvector')
+        schema_editor.execute(
+            'CREATE INDEX products_product_search_idx ON products_product USING GIN (search_vector)'
+        )
+        schema_editor.execute(
+            f"""
+            UPDATE products_product p SET search_vector = {PG_VECTOR_SQL}
+            FROM products_category c WHERE c.id = p.category_id
+            """
+        )
+    elif connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+            if not cursor.fetchone()[0]:
+                return
+        schema_editor.execute(
+            """
+            CREATE VIRTUAL TABLE IF NOT EXISTS products_product_fts
+            USING fts5(name, category, description, tokenize='porter unicode61', prefix='2 3')
+            """
+        )
+        schema_editor.execute(
+            """
+            INSERT INTO products_product_fts (rowid, name, category, description)
+            SELECT p.id, p.name, c.name, p.description
+            FROM products_product p JOIN products_category c ON c.id = p.category_id
+            """
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS products_product_search_idx')
+        schema_editor.execute('ALTER TABLE products_product DROP COLUMN IF EXISTS search_vector')
+    elif connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS products_product_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0003_product_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
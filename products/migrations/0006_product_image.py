@@ -0,0 +1,65 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:19
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def copy_additional_images(apps, schema_editor):
+    """Turn the newline-separated URL list into ordered ProductImage rows"""
+    Product = apps.get_model('products', 'Product')
+    ProductImage = apps.get_model('products', 'ProductImage')
+    images = []
+    for product_id, additional_images in Product.objects.exclude(
+        additional_images=''
+    ).values_list('id', 'additional_images'):
+        urls = [url.strip() for url in additional_images.split('\n') if url.strip()]
+        images.extend(
+            ProductImage(product_id=product_id, image_url=url, thumbnail_url=url, position=position)
+            for position, url in enumerate(urls)
+        )
+    ProductImage.objects.bulk_create(images, batch_size=500)
+
+
+def restore_additional_images(apps, schema_editor):
+    Product = apps.get_model('products', 'Product')
+    ProductImage = apps.get_model('products', 'ProductImage')
+    urls = {}
+    for product_id, image_url in ProductImage.objects.exclude(image_url='').order_by(
+        'product_id', 'position', 'id'
+    ).values_list('product_id', 'image_url'):
+        urls.setdefault(product_id, []).append(image_url)
+    for product_id, product_urls in urls.items():
+        Product.objects.filter(id=product_id).update(additional_images='\n'.join(product_urls))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0005_related_product'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductImage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('image', models.ImageField(blank=True, height_field='height', upload_to='products/gallery/', width_field='width')),
+                ('image_url', models.CharField(blank=True, help_text='External image URL, used when no file is uploaded', max_length=500)),
+                ('width', models.PositiveIntegerField(blank=True, editable=False, null=True)),
+                ('height', models.PositiveIntegerField(blank=True, editable=False, null=True)),
+                ('thumbnail_url', models.CharField(blank=True, editable=False, max_length=500)),
+                ('position', models.PositiveSmallIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='images', to='products.product')),
+            ],
+            options={
+                'ordering': ['product', 'position', 'id'],
+                'indexes': [models.Index(fields=['product', 'position'], name='product_image_order_idx')],
+            },
+        ),
+        migrations.RunPython(copy_additional_images, restore_additional_images),
+        migrations.RemoveField(
+            model_name='product',
+            name='additional_images',
+        ),
+    ]
@@ -1,13 +1,21 @@
+from django.core.files.storage import default_storage
 from django.db import models
 from django.urls import reverse
+from django.utils import timezone
 from django.utils.text import slugify
 
+from .images import build_thumbnail, thumbnail_name
+
 
 class Category(models.Model):
     name = models.CharField(max_length=100, unique=True)
     slug = models.SlugField(max_length=100, unique=True, blank=True)
     description = models.TextField(blank=True)
+    # Denormalized facet counts, maintained by products.counts
+    product_count = models.IntegerField(default=0, editable=False)
+    featured_count = models.IntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         verbose_name_plural = "Categories"
@@ -16,9 +24,18 @@ class Category(models.Model):
     def __str__(self):
         return self.name
     
+    # Only ever changed in place by products.counts - a save must not write
+    # back the instance's copy over concurrent adjustments
+    COUNTER_FIELDS = ('product_count', 'featured_count')
+    
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.name)
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS
+            ]
         super().save(*args, **kwargs)
 
 
@@ -28,9 +45,13 @@ class Product(models.Model):
     category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='products')
     description = models.TextField()
     image = models.ImageField(upload_to='products/', blank=True, null=True)
-    additional_images = models.TextField(
-        blank=True, 
-        help_text="Additional image URLs, one per line"
+    image_width = models.PositiveIntegerField(blank=True, null=True, editable=False)
+    image_height = models.PositiveIntegerField(blank=True, null=True, editable=False)
+    image_variants = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        help_text="Resized WebP/JPEG renditions of the main image"
     )
     date_completed = models.DateField()
     is_featured = models.BooleanField(default=False)
@@ -38,7 +59,12 @@ class Product(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
-        ordering = ['-date_completed', '-created_at']
+        ordering = ['-date_completed', '-created_at', '-id']
+        indexes = [
+            # Keyset pagination of the public listing, with and without a category filter
+            models.Index(fields=['-date_completed', '-created_at', '-id'], name='product_listing_idx'),
+            models.Index(fields=['category', '-date_completed', '-created_at', '-id'], name='product_cat_listing_idx'),
+        ]
     
     def __str__(self):
         return self.name
@@ -50,9 +76,87 @@ class Product(models.Model):
     
     def get_absolute_url(self):
         return reverse('products:detail', kwargs={'slug': self.slug})
+
+
+
+class ProductImage(models.Model):
+    """One picture in a product's gallery, either uploaded or an external URL"""
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='images')
+    image = models.ImageField(
+        upload_to='products/gallery/',
+        blank=True,
+        width_field='width',
+        height_field='height'
+    )
+    image_url = models.CharField(
+        max_length=500,
+        blank=True,
+        help_text="External image URL, used when no file is uploaded"
+    )
+    width = models.PositiveIntegerField(blank=True, null=True, editable=False)
+    height = models.PositiveIntegerField(blank=True, null=True, editable=False)
+    thumbnail_url = models.CharField(max_length=500, blank=True, editable=False)
+    position = models.PositiveSmallIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['product', 'position', 'id']
+        indexes = [
+            models.Index(fields=['product', 'position'], name='product_image_order_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.product.name} - image {self.position}"
+    
+    @property
+    def url(self):
+        return self.image.url if self.image else self.image_url
     
-    def get_additional_images_list(self):
-        """Return list of additional image URLs"""
-        if self.additional_images:
-            return [url.strip() for url in self.additional_images.split('\n') if url.strip()]
-        return []
\ No newline at end of file
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # Build and cache the gallery thumbnail once per upload
+        if self.image:
+            thumbnail_url = default_storage.url(thumbnail_name(self.image.name))
+            if thumbnail_url != self.thumbnail_url:
+                build_thumbnail(self.image.name)
+        else:
+            thumbnail_url = self.image_url
+        if thumbnail_url != self.thumbnail_url:
+            self.thumbnail_url = thumbnail_url
+            ProductImage.objects.filter(pk=self.pk).update(thumbnail_url=thumbnail_url)
+
+
+class RelatedProduct(models.Model):
+    """
+    Precomputed "related work" for a product, best match first.
+
+    Built by ``products.related`` - see the ``build_related_products``
+    management command - so the detail page reads it with one indexed lookup.
+    """
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='related_entries')
+    related = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='+')
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+    
+    class Meta:
+        ordering = ['product', 'rank']
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'rank'], name='unique_related_product_rank'),
+        ]
+    
+    def __str__(self):
+        return f"{self.product} -> {self.related} ({self.score:.2f})"
+
+
+class RelatedRefresh(models.Model):
+    """
+    A product whose related lists need re-scoring. Queued as products are
+    saved and drained by ``manage.py build_related_products --watch``, so
+    re-scoring never runs inside a request.
+    """
+    # Not a foreign key: a product deleted after being queued is just skipped
+    product_id = models.PositiveIntegerField(unique=True)
+    queued_at = models.DateTimeField(default=timezone.now)
+    
+    def __str__(self):
+        return f"Refresh related products of #{self.product_id}"
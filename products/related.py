@@ -0,0 +1,216 @@
+"""
+Scoring and storage of the precomputed related-products table.
+
+A candidate's score is the sum of three signals:
+
+* same category,
+* overlap (Jaccard) of the distinctive words in name and description,
+* how often the same client asked for quotes on both products.
+
+Candidates are found through an inverted index over those signals rather
+than by comparing every pair of products.
+
+Scoring needs the whole catalog loaded, so product saves only queue their
+ids (``queue_refresh``) and the worker re-scores everything queued with one
+load (``refresh_queued``).
+"""
+import math
+import re
+from collections import Counter, defaultdict
+from itertools import combinations
+
+from django.apps import apps
+from django.db import transaction
+from django.utils import timezone
+
+from core.cache import CATALOG, bump_version_on_commit
+
+from .models import Product, RelatedProduct, RelatedRefresh
+
+
+RELATED_PER_PRODUCT = 4
+
+CATEGORY_WEIGHT = 1.0
+TERMS_WEIGHT = 2.0
+CO_QUOTE_WEIGHT = 1.5
+
+# Words present in more than this share of products say nothing about relatedness
+MAX_TERM_DOCUMENT_SHARE = 0.2
+
+STOP_WORDS = {
+    'and', 'the', 'for', 'with', 'from', 'your', 'our', 'you', 'are', 'this', 'that',
+    'made', 'perfect', 'custom', 'available', 'includes', 'any',
+}
+
+_WORD_RE = re.compile(r'[a-z]{3,}')
+
+
+def _terms(text):
+    return {word for word in _WORD_RE.findall(text.lower()) if word not in STOP_WORDS}
+
+
+class Corpus:
+    """Everything needed to score the catalog, loaded with a handful of queries"""
+
+    def __init__(self):
+        self.category = {}
+        self.terms = {}
+        for product_id, category_id, name, description in Product.objects.values_list(
+            'id', 'category_id', 'name', 'description'
+        ):
+            self.category[product_id] = category_id
+            self.terms[product_id] = _terms(f'{name} {description}')
+
+        self.by_category = defaultdict(set)
+        for product_id, category_id in self.category.items():
+            self.by_category[category_id].add(product_id)
+
+        max_documents = max(2, int(len(self.terms) * MAX_TERM_DOCUMENT_SHARE))
+        postings = defaultdict(set)
+        for product_id, terms in self.terms.items():
+            for term in terms:
+                postings[term].add(product_id)
+        self.by_term = {term: ids for term, ids in postings.items() if len(ids) <= max_documents}
+
+        self.co_quotes = self._load_co_quotes()
+
+    def _load_co_quotes(self):
+        QuoteRequest = apps.get_model('quotes', 'QuoteRequest')
+        per_client = defaultdict(set)
+        for client_id, product_id in QuoteRequest.objects.filter(
+            product__isnull=False
+        ).values_list('client_id', 'product_id'):
+            per_client[client_id].add(product_id)
+
+        pairs = Counter()
+        for product_ids in per_client.values():
+            for a, b in combinations(sorted(product_ids), 2):
+                pairs[a, b] += 1
+
+        co_quotes = defaultdict(dict)
+        for (a, b), count in pairs.items():
+            co_quotes[a][b] = count
+            co_quotes[b][a] = count
+        return co_quotes
+
+    def candidates(self, product_id):
+        found = set(self.by_category.get(self.category[product_id], ()))
+        for term in self.terms[product_id]:
+            found |= self.by_term.get(term, set())
+        found |= set(self.co_quotes.get(product_id, ()))
+        found.discard(product_id)
+        return found
+
+    def score(self, product_id, other_id):
+        score = 0.0
+        if self.category[product_id] == self.category[other_id]:
+            score += CATEGORY_WEIGHT
+
+        terms, other_terms = self.terms[product_id], self.terms[other_id]
+        if terms and other_terms:
+            score += TERMS_WEIGHT * len(terms & other_terms) / len(terms | other_terms)
+
+        co_quoted = self.co_quotes.get(product_id, {}).get(other_id)
+        if co_quoted:
+            # Diminishing returns: the first shared client matters most
+            score += CO_QUOTE_WEIGHT * math.log2(1 + co_quoted)
+        return score
+
+    def top_related(self, product_id, limit=RELATED_PER_PRODUCT):
+        scored = [(self.score(product_id, other_id), other_id) for other_id in self.candidates(product_id)]
+        # Newer ids win ties so fresh work gets shown
+        scored.sort(key=lambda item: (-item[0], -item[1]))
+        return [(other_id, score) for score, other_id in scored[:limit] if score > 0]
+
+
+def _write(corpus, product_ids):
+    rows = [
+        RelatedProduct(product_id=product_id, related_id=related_id, rank=rank, score=score)
+        for product_id in product_ids
+        for rank, (related_id, score) in enumerate(corpus.top_related(product_id))
+    ]
+    with transaction.atomic():
+        RelatedProduct.objects.filter(product_id__in=product_ids).delete()
+        RelatedProduct.objects.bulk_create(rows, batch_size=1000)
+        # Detail pages embed these lists
+        bump_version_on_commit(CATALOG)
+    return len(rows)
+
+
+def build_all():
+    """Rebuild the whole table. Returns (products, rows written)"""
+    corpus = Corpus()
+    product_ids = list(corpus.category)
+    with transaction.atomic():
+        RelatedProduct.objects.all().delete()
+        written = _write(corpus, product_ids)
+    return len(product_ids), written
+
+
+def refresh(product_ids):
+    """
+    Recompute the lists affected by changes to ``product_ids``.
+
+    That is the changed products themselves plus every product that could
+    now list them, or that listed them before: their candidates, and the
+    current holders of a row pointing at them.
+    """
+    corpus = Corpus()
+    changed = set(product_ids)
+    affected = {product_id for product_id in changed if product_id in corpus.category}
+    for product_id in list(affected):
+        affected |= corpus.candidates(product_id)
+    affected |= set(
+        RelatedProduct.objects.filter(related_id__in=changed).values_list('product_id', flat=True)
+    )
+    affected &= set(corpus.category)
+    return _write(corpus, sorted(affected))
+
+
+def queue_refresh(product_ids):
+    """Queue ``product_ids`` for the worker - a requeue moves the product to the back"""
+    RelatedRefresh.objects.bulk_create(
+        [RelatedRefresh(product_id=product_id) for product_id in set(product_ids)],
+        update_conflicts=True,
+        unique_fields=['product_id'],
+        update_fields=['queued_at'],
+    )
+
+
+def refresh_queued():
+    """
+    Re-score everything queued so far with a single corpus load. Returns
+    the number of products that were queued.
+    """
+    claimed_at = timezone.now()
+    queued = RelatedRefresh.objects.filter(queued_at__lte=claimed_at)
+    product_ids = list(queued.values_list('product_id', flat=True))
+    if not product_ids:
+        return 0
+    refresh(product_ids)
+    # Products requeued meanwhile have a later queued_at and stay for the next pass
+    queued.filter(product_id__in=product_ids).delete()
+    return len(product_ids)
+
+
+def for_product(product, limit=RELATED_PER_PRODUCT):
+    """
+    The products to show as related to ``product``, best match first, in
+    one indexed lookup. A product not scored yet shows the latest work in
+    its category meanwhile and is queued, so the worker scores it once and
+    later views read its rows.
+    """
+    entries = product.related_entries.select_related('related__category')[:limit]
+    related = [entry.related for entry in entries]
+    if related:
+        return related
+    related = list(
+        Product.objects.filter(category_id=product.category_id)
+        .exclude(id=product.id)
+        .select_related('category')
+        .order_by('-date_completed', '-created_at', '-id')[:limit]
+    )
+    if related:
+        # Same-category products always score, so one pass leaves rows behind
+        RelatedRefresh.objects.bulk_create([RelatedRefresh(product_id=product.id)], ignore_conflicts=True)
+    return related
@@ -0,0 +1,110 @@
+"""
+Full-text search over the product catalog.
+
+On PostgreSQL each product row carries a weighted ``search_vector`` column
+(name > category > description) with a GIN index. On SQLite a separate FTS5
+table ``products_product_fts`` plays the same role. Both are created by
+migration ``0004_product_search_index`` and kept current by the
+``post_save``/``post_delete`` handlers in ``products.signals``.
+"""
+from django.db import connection
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+from core.fts import Fts5Table, search_backend, search_terms, tsquery
+
+
+FTS_TABLE = 'products_product_fts'
+
+PG_VECTOR_SQL = """
+    setweight(to_tsvector('english', coalesce(p.name, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce(c.name, '')), 'B') ||
+    setweight(to_tsvector('english', coalesce(p.description, '')), 'C')
+"""
+
+FTS = Fts5Table(
+    FTS_TABLE,
+    ['name', 'category', 'description'],
+    """
+    SELECT p.id, p.name, c.name, p.description
+    FROM products_product p JOIN products_category c ON c.id = p.category_id
+    """,
+    'p.id',
+)
+
+
+def index_products(product_ids):
+    """(Re)index the given products"""
+    product_ids = list(product_ids)
+    if not product_ids:
+        return
+    if search_backend() == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                UPDATE products_product p SET search_vector = {PG_VECTOR_SQL}
+                FROM products_category c
+                WHERE c.id = p.category_id AND p.id = ANY(%s)
+                """,
+                [product_ids],
+            )
+    FTS.index(product_ids)
+
+
+def unindex_product(product_id):
+    """Drop a deleted product from the index (the PostgreSQL column goes with the row)"""
+    FTS.unindex(product_id)
+
+
+def rebuild_index():
+    """Index every product from scratch"""
+    if search_backend() == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                UPDATE products_product p SET search_vector = {PG_VECTOR_SQL}
+                FROM products_category c WHERE c.id = p.category_id
+                """
+            )
+    FTS.rebuild()
+
+
+def search_products(query, queryset=None):
+    """
+    Return ``queryset`` narrowed to products matching ``query``, best match first.
+
+    Every word must match, and the last letters may be missing (``"wed dre"``
+    finds "Wedding Dress"). Results carry a ``search_rank`` annotation.
+    """
+    from .models import Product
+
+    if queryset is None:
+        queryset = Product.objects.all()
+    terms = search_terms(query)
+    if not terms:
+        return queryset.none()
+
+    backend = search_backend()
+    if backend == 'postgresql':
+        match = tsquery(terms)
+        return queryset.annotate(
+            search_rank=RawSQL(
+                "ts_rank_cd(products_product.search_vector, to_tsquery('english', %s))",
+                (match,),
+                output_field=FloatField(),
+            )
+        ).extra(
+            where=["products_product.search_vector @@ to_tsquery('english', %s)"],
+            params=[match],
+        ).order_by('-search_rank', *queryset.model._meta.ordering)
+
+    if backend == 'sqlite':
+        return queryset.filter(id__in=FTS.matching(terms)).annotate(
+            search_rank=FTS.rank(terms, 'products_product.id', [10.0, 5.0, 1.0])
+        ).order_by('-search_rank', *queryset.model._meta.ordering)
+
+    # No full-text support on this database - plain substring match
+    condition = Q()
+    for term in terms:
+        condition &= Q(name__icontains=term) | Q(description__icontains=term)
+    return queryset.filter(condition).annotate(search_rank=Value(0.0, output_field=FloatField()))
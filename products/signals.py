@@ -0,0 +1,107 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import counts, related
+from .images import delete_variants, refresh_variants
+from .models import Category, Product, ProductImage, RelatedProduct
+from .search import index_products, unindex_product
+
+
+@receiver(post_save, sender=Product)
+def build_product_image_variants(sender, instance, raw=False, **kwargs):
+    """Generate responsive variants once per uploaded image"""
+    if raw:
+        return
+    refresh_variants(instance)
+
+
+@receiver(post_delete, sender=Product)
+def delete_product_image_variants(sender, instance, **kwargs):
+    """Remove variant files along with the product"""
+    delete_variants(instance.image_variants)
+
+
+@receiver(post_save, sender=Product)
+def index_product(sender, instance, raw=False, **kwargs):
+    """Keep the full-text index in step with the product"""
+    if raw:
+        return
+    index_products([instance.pk])
+
+
+@receiver(post_delete, sender=Product)
+def unindex_deleted_product(sender, instance, **kwargs):
+    unindex_product(instance.pk)
+
+
+@receiver(pre_save, sender=Product)
+def remember_counted_state(sender, instance, raw=False, **kwargs):
+    """Note what the category counts currently include for this product"""
+    instance._counted = None
+    if raw or instance._state.adding:
+        return
+    instance._counted = Product.objects.filter(pk=instance.pk).values_list(
+        'category_id', 'is_featured'
+    ).first()
+
+
+@receiver(post_save, sender=Product)
+def update_category_counts(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_counted', None)
+    current = (instance.category_id, instance.is_featured)
+    if previous == current:
+        return
+    with transaction.atomic():
+        if previous:
+            counts.adjust(previous[0], -1, -int(previous[1]))
+        counts.adjust(current[0], 1, int(current[1]))
+
+
+@receiver(post_delete, sender=Product)
+def uncount_deleted_product(sender, instance, **kwargs):
+    counts.adjust(instance.category_id, -1, -int(instance.is_featured))
+
+
+@receiver(post_save, sender=Category)
+def reindex_category_products(sender, instance, created=False, raw=False, **kwargs):
+    """Category names are indexed with their products"""
+    if raw or created:
+        return
+    index_products(instance.products.values_list('id', flat=True))
+
+
+@receiver(post_save, sender=Product)
+def refresh_related_products(sender, instance, raw=False, **kwargs):
+    """Re-score the related lists this product can appear in"""
+    if raw:
+        return
+    # Queued in the save's transaction and scored by the related worker
+    related.queue_refresh([instance.pk])
+
+
+@receiver(pre_delete, sender=Product)
+def remember_related_holders(sender, instance, **kwargs):
+    # The cascade removes their rows pointing at this product before post_delete runs
+    instance._related_holders = list(
+        RelatedProduct.objects.filter(related=instance).values_list('product_id', flat=True)
+    )
+
+
+@receiver(post_delete, sender=Product)
+def refill_related_products(sender, instance, **kwargs):
+    holders = getattr(instance, '_related_holders', [])
+    if holders:
+        related.queue_refresh(holders)
+
+
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+def touch_gallery_product(sender, instance, raw=False, **kwargs):
+    """A gallery change is a change to the product (API ETags use updated_at)"""
+    if raw:
+        return
+    Product.objects.filter(pk=instance.product_id).update(updated_at=timezone.now())
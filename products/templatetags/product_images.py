@@ -0,0 +1,40 @@
+from django import template
+from django.core.files.storage import default_storage
+from django.utils.html import format_html
+
+from products.images import srcset
+
+register = template.Library()
+
+
+@register.simple_tag
+def product_image(product, variant='card', sizes='100vw', css_class='', style='', eager=False):
+    """
+    Render ``product.image`` as a responsive ``<picture>``.
+
+    WebP is offered first with a JPEG fallback, both with a ``srcset`` over
+    every generated width so the browser downloads the smallest file that
+    fits the slot described by ``sizes``. Products whose variants haven't
+    been built yet fall back to the original upload.
+    """
+    loading = 'eager' if eager else 'lazy'
+    image_variants = product.image_variants or {}
+    entry = image_variants.get('variants', {}).get(variant)
+
+    if not entry:
+        return format_html(
+            '<img src="{}" class="{}" style="{}" alt="{}" loading="{}" decoding="async">',
+            product.image.url, css_class, style, product.name, loading,
+        )
+
+    return format_html(
+        '<picture>'
+        '<source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" width="{}" height="{}" '
+        'class="{}" style="{}" alt="{}" loading="{}" decoding="async">'
+        '</picture>',
+        srcset(image_variants, 'webp'), sizes,
+        default_storage.url(entry['jpeg']), srcset(image_variants, 'jpeg'), sizes,
+        entry['width'], entry['height'],
+        css_class, style, product.name, loading,
+    )
@@ -1,9 +1,16 @@
 from django.urls import path
-from . import views
+from . import api, views
 
 app_name = 'products'
 
 urlpatterns = [
     path('', views.product_list, name='list'),
+    path('search/', views.product_search, name='search'),
+    path('page/<int:page>/', views.product_list, name='page'),
+    path('category/<slug:category_slug>/', views.product_list, name='category'),
+    path('category/<slug:category_slug>/page/<int:page>/', views.product_list, name='category_page'),
+    path('api/categories/', api.category_list, name='api_categories'),
+    path('api/products/', api.product_list, name='api_products'),
+    path('api/products/<slug:slug>/', api.product_detail, name='api_product_detail'),
     path('<slug:slug>/', views.product_detail, name='detail'),
 ]
\ No newline at end of file
@@ -1,42 +1,101 @@
 from django.shortcuts import render, get_object_or_404
 from django.core.paginator import Paginator
+from django.urls import reverse
+from core.cache import cache_catalog_page
+from core.pagination import KeysetPaginator
+from . import related
+from .counts import totals
 from .models import Product, Category
+from .search import search_products
 
 
-def product_list(request):
+PRODUCTS_PER_PAGE = 12
+SEARCH_RESULTS = 48
+
+
+def _page_url(category, number):
+    if category:
+        return reverse('products:category_page', args=[category.slug, number])
+    return reverse('products:page', args=[number])
+
+
+@cache_catalog_page
+def product_list(request, category_slug=None, page=None):
     """Display all products with filtering by category"""
-    products = Product.objects.all()
-    categories = Category.objects.all()
+    products = Product.objects.select_related('category').prefetch_related('images')
+    # Facet counts are stored on the category rows
+    categories = list(Category.objects.all())
+    
+    # Path-style URLs (/category/<slug>/page/<n>/) are plain numbered pages
+    # with no query strings, so they can also be served as static files
+    path_style = category_slug is not None or page is not None
     
     # Filter by category if specified
-    category_slug = request.GET.get('category')
+    category_slug = category_slug or request.GET.get('category')
     selected_category = None
     if category_slug:
         selected_category = get_object_or_404(Category, slug=category_slug)
         products = products.filter(category=selected_category)
     
-    # Pagination
-    paginator = Paginator(products, 12)  # Show 12 products per page
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Pagination - cursor based, ?page=N is kept working for old links
+    page_links = {}
+    if path_style or 'page' in request.GET:
+        paginator = Paginator(products, PRODUCTS_PER_PAGE)
+        page_obj = paginator.get_page(page or request.GET.get('page'))
+        cursor_mode = False
+        if page_obj.has_previous():
+            page_links['first'] = _page_url(selected_category, 1)
+            page_links['previous'] = _page_url(selected_category, page_obj.previous_page_number())
+        if page_obj.has_next():
+            page_links['next'] = _page_url(selected_category, page_obj.next_page_number())
+            page_links['last'] = _page_url(selected_category, paginator.num_pages)
+    else:
+        paginator = KeysetPaginator(products, PRODUCTS_PER_PAGE, Product._meta.ordering)
+        page_obj = paginator.get_page(request.GET.get('cursor'))
+        cursor_mode = True
     
     context = {
         'page_obj': page_obj,
         'categories': categories,
+        'catalog_totals': totals(categories),
         'selected_category': selected_category,
+        'cursor_mode': cursor_mode,
+        'path_style': path_style,
+        'page_links': page_links,
     }
+    
+    # Infinite scroll only needs the next batch of cards
+    if request.GET.get('fragment') == 'cards':
+        return render(request, 'products/_product_cards.html', context)
     return render(request, 'products/list.html', context)
 
 
+def product_search(request):
+    """Full-text search over the portfolio"""
+    query = request.GET.get('q', '').strip()
+    products = []
+    if query:
+        products = search_products(
+            query, Product.objects.select_related('category').prefetch_related('images')
+        )[:SEARCH_RESULTS]
+    
+    context = {
+        'query': query,
+        'products': products,
+    }
+    return render(request, 'products/search.html', context)
+
+
+@cache_catalog_page
 def product_detail(request, slug):
     """Display single product detail"""
-    product = get_object_or_404(Product, slug=slug)
-    related_products = Product.objects.filter(
-        category=product.category
-    ).exclude(id=product.id)[:4]
+    product = get_object_or_404(
+        Product.objects.select_related('category').prefetch_related('images'), slug=slug
+    )
     
     context = {
         'product': product,
-        'related_products': related_products,
+        # Precomputed by products.related
+        'related_products': related.for_product(product),
     }
-    return render(request, 'products/detail.html', context)
\ No newline at end of file
+    return render(request, 'products/detail.html', context)
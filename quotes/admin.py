@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import QuoteRequest, Measurements
+from .models import QuoteRequest, Measurements, QuoteStatusChange
+from .status import log_changes
 
 
 class MeasurementsInline(admin.StackedInline):
@@ -7,6 +8,17 @@ class MeasurementsInline(admin.StackedInline):
     extra = 0
 
 
+class QuoteStatusChangeInline(admin.TabularInline):
+    model = QuoteStatusChange
+    extra = 0
+    fields = ['changed_at', 'from_status', 'to_status', 'changed_by']
+    readonly_fields = fields
+    can_delete = False
+    
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
 @admin.register(QuoteRequest)
 class QuoteRequestAdmin(admin.ModelAdmin):
     list_display = [
@@ -16,6 +28,7 @@ class QuoteRequestAdmin(admin.ModelAdmin):
     search_fields = ['client__full_name', 'client__phone_number', 'product__name']
     readonly_fields = ['created_at', 'updated_at', 'get_whatsapp_message']
     list_editable = ['status']
+    inlines = [QuoteStatusChangeInline]
     
     fieldsets = (
         ('Client Information', {
@@ -37,6 +50,12 @@ class QuoteRequestAdmin(admin.ModelAdmin):
         }),
     )
     
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        # Includes list_editable saves - keep the audit trail complete
+        if change and 'status' in form.changed_data:
+            log_changes([(obj.pk, form.initial['status'])], obj.status, request.user, obj.updated_at)
+    
     def get_whatsapp_message(self, obj):
         return obj.get_whatsapp_message()
     get_whatsapp_message.short_description = "WhatsApp Message"
@@ -44,5 +63,6 @@ class QuoteRequestAdmin(admin.ModelAdmin):
 
 @admin.register(Measurements)
 class MeasurementsAdmin(admin.ModelAdmin):
-    list_display = ['chest', 'waist', 'hips', 'shoulder', 'sleeve_length', 'full_length']
-    search_fields = ['quoterequest__client__full_name']
\ No newline at end of file
+    list_display = ['client', 'chest', 'waist', 'hips', 'shoulder', 'sleeve_length', 'full_length', 'last_used_at']
+    list_select_related = ['client']
+    search_fields = ['client__full_name', 'client__phone_number']
\ No newline at end of file
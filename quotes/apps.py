@@ -3,4 +3,7 @@ from django.apps import AppConfig
 
 class QuotesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'quotes'
\ No newline at end of file
+    name = 'quotes'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -1,10 +1,21 @@
+import os
+
 from django import forms
+from django.conf import settings
 from .models import QuoteRequest, Measurements
 from clients.models import Client
+from clients.phone import InvalidPhoneNumber, normalize_phone
+from .measurements import latest_for_client
 from products.models import Product
 
 
 class MeasurementsForm(forms.ModelForm):
+    use_saved = forms.BooleanField(
+        required=False,
+        label='Use the measurements from my last order',
+        widget=forms.CheckboxInput(attrs={'class': 'form-check-input'})
+    )
+    
     class Meta:
         model = Measurements
         fields = [
@@ -48,6 +59,58 @@ class MeasurementsForm(forms.ModelForm):
                 'placeholder': 'Any additional measurement notes...'
             }),
         }
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Checked in clean() - not needed when reusing saved measurements
+        for name in Measurements.VALUE_FIELDS:
+            self.fields[name].required = False
+    
+    def skips_measurements(self):
+        return self.cleaned_data.get('use_saved')
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        if not self.skips_measurements():
+            for name in Measurements.VALUE_FIELDS:
+                if name != 'additional_notes' and cleaned_data.get(name) is None and name not in self.errors:
+                    self.add_error(name, 'This field is required.')
+        return cleaned_data
+    
+    def measurement_values(self):
+        return tuple(self.cleaned_data.get(name) for name in Measurements.VALUE_FIELDS)
+    
+    def resolve_saved(self, phone_number, returning):
+        """
+        Look up the saved measurements when the client asked to reuse them.
+        Only the client remembered on this device (``returning``) can reuse
+        theirs - for anyone else, with or without saved measurements, this
+        returns False with the same form error asking for them, so the
+        answer says nothing about the phone number.
+        """
+        self.saved = None
+        if not self.cleaned_data.get('use_saved'):
+            return True
+        if returning is not None and returning.phone_number == phone_number:
+            self.saved = latest_for_client(returning.pk)
+        if self.saved is None:
+            self.add_error(
+                'use_saved',
+                "We couldn't find saved measurements to reuse from this device - please enter them below."
+            )
+            return False
+        return True
+
+
+class PhoneNumberField(forms.CharField):
+    """Accepts any common spelling and cleans to E.164"""
+    
+    def clean(self, value):
+        value = super().clean(value)
+        try:
+            return normalize_phone(value)
+        except InvalidPhoneNumber:
+            raise forms.ValidationError('Enter a valid phone number, e.g. 0723835202.')
 
 
 class ExistingProductQuoteForm(forms.Form):
@@ -59,8 +122,8 @@ class ExistingProductQuoteForm(forms.Form):
             'placeholder': 'Your Full Name'
         })
     )
-    phone_number = forms.CharField(
-        max_length=15,
+    phone_number = PhoneNumberField(
+        max_length=20,
         widget=forms.TextInput(attrs={
             'class': 'form-control',
             'placeholder': '0723835202'
@@ -92,6 +155,9 @@ class ExistingProductQuoteForm(forms.Form):
     )
 
 
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp', '.gif', '.bmp', '.tif', '.tiff'}
+
+
 class CustomProjectQuoteForm(forms.Form):
     # Client information
     full_name = forms.CharField(
@@ -101,8 +167,8 @@ class CustomProjectQuoteForm(forms.Form):
             'placeholder': 'Your Full Name'
         })
     )
-    phone_number = forms.CharField(
-        max_length=15,
+    phone_number = PhoneNumberField(
+        max_length=20,
         widget=forms.TextInput(attrs={
             'class': 'form-control',
             'placeholder': '0723835202'
@@ -131,7 +197,9 @@ class CustomProjectQuoteForm(forms.Form):
             'placeholder': 'e.g., Cotton, Silk, Polyester blend'
         })
     )
-    reference_image = forms.ImageField(
+    # A plain FileField: the image is decoded by the background worker
+    # (quotes.references), not inside the request
+    reference_image = forms.FileField(
         required=False,
         widget=forms.FileInput(attrs={
             'class': 'form-control',
@@ -145,4 +213,106 @@ class CustomProjectQuoteForm(forms.Form):
             'rows': 3,
             'placeholder': 'Any additional requirements...'
         })
-    )
\ No newline at end of file
+    )
+    
+    def clean_reference_image(self):
+        """Cheap checks only - size, extension and declared type"""
+        upload = self.cleaned_data.get('reference_image')
+        if not upload:
+            return upload
+        if upload.size > settings.QUOTE_REFERENCE_MAX_UPLOAD_MB * 1024 * 1024:
+            raise forms.ValidationError(
+                f'Please upload an image smaller than {settings.QUOTE_REFERENCE_MAX_UPLOAD_MB} MB.'
+            )
+        extension = os.path.splitext(upload.name)[1].lower()
+        content_type = getattr(upload, 'content_type', '') or ''
+        if extension not in IMAGE_EXTENSIONS or not content_type.startswith('image/'):
+            raise forms.ValidationError('Please upload an image file (JPEG, PNG, WebP or GIF).')
+        return upload
+
+MAX_BASKET_ITEMS = 10
+
+class QuoteBasketForm(forms.Form):
+    """Who the basket is for - entered once for every garment"""
+    full_name = forms.CharField(
+        max_length=200,
+        widget=forms.TextInput(attrs={
+            'class': 'form-control',
+            'placeholder': 'Your Full Name'
+        })
+    )
+    phone_number = PhoneNumberField(
+        max_length=20,
+        widget=forms.TextInput(attrs={
+            'class': 'form-control',
+            'placeholder': '0723835202'
+        })
+    )
+    email = forms.EmailField(
+        required=False,
+        widget=forms.EmailInput(attrs={
+            'class': 'form-control',
+            'placeholder': 'your.email@example.com (Optional)'
+        })
+    )
+
+
+class QuoteBasketItemForm(MeasurementsForm):
+    """One garment in the basket, with its own or the first garment's measurements"""
+    product = forms.ModelChoiceField(
+        queryset=Product.objects.only('id', 'name', 'slug').order_by('name'),
+        to_field_name='slug',
+        empty_label='Choose a design...',
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
+    fabric_preference = forms.CharField(
+        max_length=200,
+        widget=forms.TextInput(attrs={
+            'class': 'form-control',
+            'placeholder': 'e.g., Cotton, Silk, Polyester blend'
+        })
+    )
+    item_notes = forms.CharField(
+        required=False,
+        widget=forms.Textarea(attrs={
+            'class': 'form-control',
+            'rows': 2,
+            'placeholder': 'Any special requirements for this garment...'
+        })
+    )
+    same_measurements = forms.BooleanField(
+        required=False,
+        initial=True,
+        label='Same measurements as the first garment',
+        widget=forms.CheckboxInput(attrs={'class': 'form-check-input'})
+    )
+    use_saved = None
+    
+    def skips_measurements(self):
+        return self.cleaned_data.get('same_measurements')
+
+
+class BaseQuoteBasketFormSet(forms.BaseFormSet):
+    
+    def get_form_kwargs(self, index):
+        # A garment added in the browser and left blank must be filled in or
+        # removed, not validate as an empty form
+        return {**super().get_form_kwargs(index), 'empty_permitted': False}
+    
+    def clean(self):
+        if any(self.errors):
+            return
+        first = self.forms[0]
+        if first.cleaned_data.get('same_measurements'):
+            raise forms.ValidationError('Please enter measurements for the first garment.')
+
+
+QuoteBasketItemFormSet = forms.formset_factory(
+    QuoteBasketItemForm,
+    formset=BaseQuoteBasketFormSet,
+    extra=0,
+    min_num=1,
+    max_num=MAX_BASKET_ITEMS,
+    validate_min=True,
+    validate_max=True,
+)
@@ -0,0 +1,72 @@
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from quotes.references import claim_next, process
+
+
+class Command(BaseCommand):
+    help = (
+        'Process staged quote reference images: validate, strip EXIF, downscale and '
+        're-encode them, then attach them to their quotes. Runs until stopped unless --once is given.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=2,
+            help='Worker threads (Pillow releases the GIL while decoding and encoding)'
+        )
+        parser.add_argument(
+            '--poll', type=float, default=2.0,
+            help='Seconds to wait before checking an empty queue again'
+        )
+        parser.add_argument('--once', action='store_true', help='Exit when the queue is empty')
+
+    def handle(self, *args, **options):
+        self.stop = threading.Event()
+        self.once = options['once']
+        self.poll = options['poll']
+        self.lock = threading.Lock()
+        self.done = self.failed = 0
+
+        # SIGTERM (platform shutdown) finishes the jobs in hand, then exits
+        signal.signal(signal.SIGTERM, lambda *args: self.stop.set())
+
+        threads = [
+            threading.Thread(target=self.work, name=f'reference-worker-{number}', daemon=True)
+            for number in range(max(1, options['workers']))
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            while any(thread.is_alive() for thread in threads):
+                for thread in threads:
+                    thread.join(timeout=0.5)
+        except KeyboardInterrupt:
+            self.stop.set()
+            for thread in threads:
+                thread.join()
+
+        self.stdout.write(self.style.SUCCESS(f'{self.done} images processed, {self.failed} failed'))
+
+    def work(self):
+        try:
+            while not self.stop.is_set():
+                job = claim_next()
+                if job is None:
+                    if self.once:
+                        return
+                    self.stop.wait(self.poll)
+                    continue
+                ok = process(job)
+                with self.lock:
+                    if ok:
+                        self.done += 1
+                    else:
+                        self.failed += 1
+                self.stdout.write(f'Quote #{job.quote_id}: {"done" if ok else "failed"}')
+        finally:
+            # Each thread has its own connection
+            connection.close()
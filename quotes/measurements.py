@@ -0,0 +1,50 @@
+"""
+Saved client measurements.
+
+A client's ``Measurements`` rows form their history: a quote reuses the row
+whose values match exactly (bumping its ``last_used_at``) and only a changed
+set adds a row. "Latest" is the most recently used row, found through the
+``(client, -last_used_at)`` index.
+
+Saved values are only ever shown back to, or reused from, the device that
+entered them (a signed cookie, see ``clients.identity``) - a phone number
+alone never reveals whether it has any.
+"""
+from django.utils import timezone
+
+from .models import Measurements
+
+
+def latest_for_client(client_id):
+    if not client_id:
+        return None
+    return Measurements.objects.filter(client_id=client_id).order_by('-last_used_at').first()
+
+
+def record(client, value_sets):
+    """
+    Return one Measurements row per entry of ``value_sets`` (tuples in
+    ``Measurements.VALUE_FIELDS`` order), reusing the client's matching rows.
+    One SELECT, one bulk INSERT for new sets and one UPDATE for reused ones.
+    """
+    existing = {row.value_tuple(): row for row in Measurements.objects.filter(client=client)}
+    created = {}
+    rows = []
+    for values in value_sets:
+        row = existing.get(values) or created.get(values)
+        if row is None:
+            row = created[values] = Measurements(
+                client=client, **dict(zip(Measurements.VALUE_FIELDS, values))
+            )
+        rows.append(row)
+
+    Measurements.objects.bulk_create(created.values())
+    reused = {row.pk for row in rows if row.pk and row.value_tuple() not in created}
+    if reused:
+        Measurements.objects.filter(pk__in=reused).update(last_used_at=timezone.now())
+    return rows
+
+
+def use(measurements):
+    """Mark a saved row as the client's latest"""
+    Measurements.objects.filter(pk=measurements.pk).update(last_used_at=timezone.now())
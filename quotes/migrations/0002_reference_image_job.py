@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:26
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quotes', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReferenceImageJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('staged_file', models.CharField(help_text='Storage path of the untouched upload', max_length=255)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('original_size', models.PositiveIntegerField(default=0, help_text='in bytes')),
+                ('final_size', models.PositiveIntegerField(blank=True, help_text='in bytes', null=True)),
+                ('width', models.PositiveIntegerField(blank=True, null=True)),
+                ('height', models.PositiveIntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('processing_ms', models.PositiveIntegerField(blank=True, null=True)),
+                ('quote', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='reference_job', to='quotes.quoterequest')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'created_at'], name='reference_job_queue_idx')],
+            },
+        ),
+    ]
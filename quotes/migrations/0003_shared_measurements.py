@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:29
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quotes', '0002_reference_image_job'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='quoterequest',
+            name='measurements',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='quote_requests', to='quotes.measurements'),
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:34
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+VALUE_FIELDS = ['chest', 'waist', 'hips', 'shoulder', 'sleeve_length', 'full_length', 'additional_notes']
+
+
+def attach_to_clients(apps, schema_editor):
+    """
+    Give existing rows the client and dates of the quotes using them, and
+    fold identical rows of one client together so "latest" is unambiguous.
+    """
+    Measurements = apps.get_model('quotes', 'Measurements')
+    QuoteRequest = apps.get_model('quotes', 'QuoteRequest')
+
+    usage = {}
+    for measurements_id, client_id, created_at in QuoteRequest.objects.order_by('created_at').values_list(
+        'measurements_id', 'client_id', 'created_at'
+    ):
+        first = usage.get(measurements_id, (client_id, created_at, created_at))
+        usage[measurements_id] = (first[0], first[1], created_at)
+
+    keepers = {}
+    dates = {}
+    for row in Measurements.objects.filter(pk__in=usage).order_by('pk'):
+        client_id, first_used, last_used = usage[row.pk]
+        key = (client_id,) + tuple(getattr(row, name) for name in VALUE_FIELDS)
+        keeper_id = keepers.setdefault(key, row.pk)
+        if keeper_id != row.pk:
+            QuoteRequest.objects.filter(measurements_id=row.pk).update(measurements_id=keeper_id)
+            row.delete()
+        first, last = dates.get(keeper_id, (first_used, last_used))
+        dates[keeper_id] = (min(first, first_used), max(last, last_used))
+        Measurements.objects.filter(pk=keeper_id).update(
+            client_id=client_id, created_at=dates[keeper_id][0], last_used_at=dates[keeper_id][1]
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0003_unique_phone_number'),
+        ('quotes', '0003_shared_measurements'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='measurements',
+            name='client',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='measurements', to='clients.client'),
+        ),
+        migrations.AddField(
+            model_name='measurements',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='measurements',
+            name='last_used_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name='measurements',
+            index=models.Index(fields=['client', '-last_used_at'], name='measurements_latest_idx'),
+        ),
+        migrations.RunPython(attach_to_clients, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:42
+
+from django.db import DatabaseError, migrations, models, transaction
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        try:
+            with transaction.atomic(using=connection.alias):
+                schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        except DatabaseError:
+            # Needs a privileged role; search falls back to unindexed matching
+            return
+        schema_editor.execute(
+            'CREATE INDEX IF NOT EXISTS clients_client_name_trgm_idx '
+            'ON clients_client USING GIN (full_name gin_trgm_ops)'
+        )
+        schema_editor.execute(
+            'CREATE INDEX IF NOT EXISTS products_product_name_trgm_idx '
+            'ON products_product USING GIN (name gin_trgm_ops)'
+        )
+    elif connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+            if not cursor.fetchone()[0]:
+                return
+        schema_editor.execute(
+            """
+            CREATE VIRTUAL TABLE IF NOT EXISTS quotes_quoterequest_fts
+            USING fts5(client_name, product_name, tokenize='unicode61', prefix='2 3')
+            """
+        )
+        schema_editor.execute(
+            """
+            INSERT INTO quotes_quoterequest_fts (rowid, client_name, product_name)
+            SELECT q.id, c.full_name, coalesce(p.name, '')
+            FROM quotes_quoterequest q
+            JOIN clients_client c ON c.id = q.client_id
+            LEFT JOIN products_product p ON p.id = q.product_id
+            """
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS clients_client_name_trgm_idx')
+        schema_editor.execute('DROP INDEX IF EXISTS products_product_name_trgm_idx')
+    elif connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS quotes_quoterequest_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0005_client_search_index'),
+        ('products', '0008_category_counts'),
+        ('quotes', '0005_created_at_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='quoterequest',
+            index=models.Index(fields=['status', 'quote_type', '-created_at'], name='quote_status_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quoterequest',
+            index=models.Index(fields=['quote_type', '-created_at'], name='quote_type_created_idx'),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quotes', '0006_quote_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='quoterequest',
+            index=models.Index(fields=['updated_at', 'id'], name='quote_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quotes', '0008_quote_status_change'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='quotestatuschange',
+            index=models.Index(fields=['to_status', 'changed_at'], name='status_change_stage_idx'),
+        ),
+    ]
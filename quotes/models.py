@@ -1,9 +1,22 @@
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
 from clients.models import Client
 from products.models import Product
 
 
 class Measurements(models.Model):
+    # Compared when deciding whether a client's saved row can be reused
+    VALUE_FIELDS = ['chest', 'waist', 'hips', 'shoulder', 'sleeve_length', 'full_length', 'additional_notes']
+    
+    # A client's rows are their measurement history; see quotes.measurements
+    client = models.ForeignKey(
+        Client,
+        on_delete=models.CASCADE,
+        blank=True,
+        null=True,
+        related_name='measurements'
+    )
     chest = models.DecimalField(max_digits=5, decimal_places=1, help_text="in inches")
     waist = models.DecimalField(max_digits=5, decimal_places=1, help_text="in inches")
     hips = models.DecimalField(max_digits=5, decimal_places=1, help_text="in inches")
@@ -11,12 +24,21 @@ class Measurements(models.Model):
     sleeve_length = models.DecimalField(max_digits=5, decimal_places=1, help_text="in inches")
     full_length = models.DecimalField(max_digits=5, decimal_places=1, help_text="in inches")
     additional_notes = models.TextField(blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    last_used_at = models.DateTimeField(default=timezone.now)
     
     class Meta:
         verbose_name_plural = "Measurements"
+        indexes = [
+            # Latest measurements for a client
+            models.Index(fields=['client', '-last_used_at'], name='measurements_latest_idx'),
+        ]
     
     def __str__(self):
         return f"Measurements - Chest: {self.chest}, Waist: {self.waist}"
+    
+    def value_tuple(self):
+        return tuple(getattr(self, name) for name in self.VALUE_FIELDS)
 
 
 class QuoteRequest(models.Model):
@@ -60,7 +82,8 @@ class QuoteRequest(models.Model):
     
     # Common fields
     fabric_preference = models.CharField(max_length=200)
-    measurements = models.OneToOneField(Measurements, on_delete=models.CASCADE)
+    # Shared by the garments of one basket when the measurements are identical
+    measurements = models.ForeignKey(Measurements, on_delete=models.CASCADE, related_name='quote_requests')
     additional_notes = models.TextField(blank=True)
     
     created_at = models.DateTimeField(auto_now_add=True)
@@ -68,6 +91,15 @@ class QuoteRequest(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Date-range scans for the dashboard analytics
+            models.Index(fields=['created_at'], name='quote_created_idx'),
+            # Dashboard list filtered by status and/or type, newest first
+            models.Index(fields=['status', 'quote_type', '-created_at'], name='quote_status_type_idx'),
+            models.Index(fields=['quote_type', '-created_at'], name='quote_type_created_idx'),
+            # The live dashboard's "changed since" feed (core.live)
+            models.Index(fields=['updated_at', 'id'], name='quote_updated_idx'),
+        ]
     
     def __str__(self):
         if self.quote_type == 'existing' and self.product:
@@ -81,4 +113,79 @@ class QuoteRequest(models.Model):
         if self.quote_type == 'existing' and self.product:
             base_msg += f" for {self.product.name}"
         base_msg += ". We will review your requirements and get back to you soon. - Tecky Collections"
-        return base_msg
\ No newline at end of file
+        return base_msg
+
+
+class QuoteStatusChange(models.Model):
+    """
+    One status change of a quote - the audit trail behind the dashboard's
+    status updates (see quotes.status).
+    """
+    quote = models.ForeignKey(QuoteRequest, on_delete=models.CASCADE, related_name='status_changes')
+    from_status = models.CharField(max_length=10, choices=QuoteRequest.STATUS_CHOICES)
+    to_status = models.CharField(max_length=10, choices=QuoteRequest.STATUS_CHOICES)
+    changed_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name='+'
+    )
+    changed_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        ordering = ['changed_at', 'id']
+        indexes = [
+            # A quote's history, oldest first
+            models.Index(fields=['quote', 'changed_at'], name='status_change_quote_idx'),
+            # Arrivals at a status over a date range (core.funnel rebuilds)
+            models.Index(fields=['to_status', 'changed_at'], name='status_change_stage_idx'),
+        ]
+    
+    def __str__(self):
+        return f"Quote #{self.quote_id}: {self.from_status} -> {self.to_status}"
+
+
+class ReferenceImageJob(models.Model):
+    """
+    A staged reference image waiting to be processed by the background worker
+    (``manage.py process_reference_images``).
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('processing', 'Processing'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+    
+    quote = models.OneToOneField(QuoteRequest, on_delete=models.CASCADE, related_name='reference_job')
+    staged_file = models.CharField(max_length=255, help_text="Storage path of the untouched upload")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    
+    # Timings and sizes, shown on the dashboard
+    original_size = models.PositiveIntegerField(default=0, help_text="in bytes")
+    final_size = models.PositiveIntegerField(blank=True, null=True, help_text="in bytes")
+    width = models.PositiveIntegerField(blank=True, null=True)
+    height = models.PositiveIntegerField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+    processing_ms = models.PositiveIntegerField(blank=True, null=True)
+    
+    class Meta:
+        indexes = [
+            # The worker's claim query
+            models.Index(fields=['status', 'created_at'], name='reference_job_queue_idx'),
+        ]
+    
+    def __str__(self):
+        return f"Reference image for quote #{self.quote_id} ({self.status})"
+    
+    @property
+    def wait_seconds(self):
+        """Time spent queued before a worker picked the job up"""
+        if self.started_at:
+            return (self.started_at - self.created_at).total_seconds()
+        return None
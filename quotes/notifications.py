@@ -0,0 +1,48 @@
+"""
+Emails about new quote requests, queued in the submitting transaction
+(see core.outbox).
+"""
+from core import outbox
+
+
+def _describe(quote):
+    if quote.quote_type == 'existing' and quote.product:
+        what = quote.product.name
+    else:
+        what = f'Custom project: {quote.custom_description}'
+    lines = [f'- #{quote.pk} {what}', f'  Fabric: {quote.fabric_preference}']
+    if quote.additional_notes:
+        lines.append(f'  Notes: {quote.additional_notes}')
+    return '\n'.join(lines)
+
+
+def queue_quote_notifications(client, quotes):
+    """One email to the business listing every quote, one confirmation to the client"""
+    quotes = list(quotes)
+    if not quotes:
+        return
+    count = len(quotes)
+    body = '\n'.join([
+        f'{client.full_name} ({client.phone_number}) requested {count} quote{"s" if count != 1 else ""}:',
+        '',
+        *[_describe(quote) for quote in quotes],
+        '',
+        f'WhatsApp: https://wa.me/{client.phone_number.lstrip("+")}',
+    ])
+    outbox.enqueue(
+        'quote_request',
+        f'New quote request from {client.full_name}',
+        body,
+        reply_to=client.email or '',
+    )
+
+    if client.email:
+        if count == 1:
+            message = quotes[0].get_whatsapp_message()
+        else:
+            names = ', '.join(quote.product.name for quote in quotes if quote.product)
+            message = (
+                f'Hello {client.full_name}, thank you for your quote request for {names}. '
+                f'We will review your requirements and get back to you soon. - Tecky Collections'
+            )
+        outbox.enqueue('quote_confirmation', 'Your quote request - Tecky Collections', message, [client.email])
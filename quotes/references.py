@@ -0,0 +1,118 @@
+"""
+Background processing of quote reference images.
+
+The request only streams the upload into a staging path and records a
+``ReferenceImageJob``; decoding and re-encoding happen later in
+``manage.py process_reference_images``, away from the web workers.
+
+Jobs are claimed with a conditional UPDATE, so any number of worker threads
+or processes can share the queue without locking rows.
+"""
+import io
+import os
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models import F, Q
+from django.utils import timezone
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .models import QuoteRequest, ReferenceImageJob
+
+
+STAGING_DIR = 'quote_references/staging'
+MAX_ATTEMPTS = 3
+
+# A job still "processing" after this long belonged to a worker that died
+STALE_AFTER = timedelta(minutes=10)
+
+# Retrying cannot fix a file that is not a usable image
+PERMANENT_ERRORS = (UnidentifiedImageError, Image.DecompressionBombError, SyntaxError, ValueError)
+
+
+def stage_upload(upload):
+    """Copy an uploaded file into staging storage chunk by chunk. Returns its path"""
+    extension = os.path.splitext(upload.name)[1].lower()[:10]
+    return default_storage.save(f'{STAGING_DIR}/{uuid.uuid4().hex}{extension}', upload)
+
+
+def discard_staged(path):
+    if path and default_storage.exists(path):
+        default_storage.delete(path)
+
+
+def claim_next():
+    """Take the oldest runnable job, or return None when the queue is empty"""
+    stale = timezone.now() - STALE_AFTER
+    runnable = Q(status='pending') | Q(status='processing', started_at__lt=stale)
+    candidates = ReferenceImageJob.objects.filter(runnable).order_by('created_at').values_list('id', flat=True)
+    for job_id in candidates[:10]:
+        claimed = ReferenceImageJob.objects.filter(runnable, pk=job_id).update(
+            status='processing',
+            started_at=timezone.now(),
+            attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return ReferenceImageJob.objects.select_related('quote').get(pk=job_id)
+    return None
+
+
+def _reencode(data):
+    """Validate, apply and drop EXIF, downscale and re-encode as JPEG"""
+    with Image.open(io.BytesIO(data)) as image:
+        image.verify()
+    with Image.open(io.BytesIO(data)) as image:
+        # Rotate per the EXIF orientation, then copy pixels only - no metadata
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ('RGB', 'L'):
+            background = Image.new('RGB', image.size, (255, 255, 255))
+            rgba = image.convert('RGBA')
+            background.paste(rgba, mask=rgba.split()[-1])
+            image = background
+        max_dimension = settings.QUOTE_REFERENCE_MAX_DIMENSION
+        image.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+        clean = Image.frombytes(image.mode, image.size, image.tobytes())
+
+        output = io.BytesIO()
+        clean.save(output, 'JPEG', quality=85, optimize=True, progressive=True)
+        return output.getvalue(), clean.size
+
+
+def process(job):
+    """Run one claimed job to completion, recording the outcome on it"""
+    started = time.monotonic()
+    try:
+        with default_storage.open(job.staged_file) as staged:
+            data = staged.read()
+        content, (width, height) = _reencode(data)
+        name = default_storage.save(f'quote_references/{uuid.uuid4().hex}.jpg', ContentFile(content))
+    except Exception as e:
+        permanent = isinstance(e, PERMANENT_ERRORS) or job.attempts >= MAX_ATTEMPTS
+        status = 'failed' if permanent else 'pending'
+        ReferenceImageJob.objects.filter(pk=job.pk).update(
+            status=status,
+            error='Not a recognised image file' if isinstance(e, UnidentifiedImageError) else f'{type(e).__name__}: {e}',
+            finished_at=timezone.now(),
+            processing_ms=int((time.monotonic() - started) * 1000),
+        )
+        if status == 'failed':
+            discard_staged(job.staged_file)
+        return False
+
+    # update() skips auto_now; the live dashboard follows updated_at
+    QuoteRequest.objects.filter(pk=job.quote_id).update(reference_image=name, updated_at=timezone.now())
+    ReferenceImageJob.objects.filter(pk=job.pk).update(
+        status='done',
+        error='',
+        final_size=len(content),
+        width=width,
+        height=height,
+        finished_at=timezone.now(),
+        processing_ms=int((time.monotonic() - started) * 1000),
+    )
+    discard_staged(job.staged_file)
+    return True
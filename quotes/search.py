@@ -0,0 +1,111 @@
+"""
+Search for the dashboard quote list.
+
+A quote matches when every word of the query appears in its client's name
+or its product's name; a number-like query matches the client's phone
+number instead, by prefix or anywhere in it (see
+``clients.search.phone_condition``). Results carry a ``search_rank``
+annotation.
+
+* PostgreSQL with ``pg_trgm`` - each word becomes an ``ILIKE '%word%'``
+  answered by trigram GIN indexes on client and product names, ranked by
+  ``similarity()``.
+* SQLite - an FTS5 shadow table ``quotes_quoterequest_fts`` with the
+  client and product name of every quote, matched and ranked by ``bm25()``
+  in subqueries of the quote query itself. It is kept current by
+  ``quotes.signals`` and by ``index_quotes`` after bulk inserts.
+
+Both are created by migration ``0006_quote_search_index``. Status and
+type filters are applied to the same query, through the composite
+``(status, quote_type, created_at)`` and ``(quote_type, created_at)``
+indexes.
+"""
+from django.db.models import FloatField, Q, Value
+from django.db.models.functions import Greatest
+
+from clients.models import Client
+from clients.search import phone_condition
+from core.fts import Fts5Table, like_pattern, postgres_has_trgm, search_backend, search_terms
+from products.models import Product
+
+
+FTS_TABLE = 'quotes_quoterequest_fts'
+
+FTS = Fts5Table(
+    FTS_TABLE,
+    ['client_name', 'product_name'],
+    """
+    SELECT q.id, c.full_name, coalesce(p.name, '')
+    FROM quotes_quoterequest q
+    JOIN clients_client c ON c.id = q.client_id
+    LEFT JOIN products_product p ON p.id = q.product_id
+    """,
+    'q.id',
+)
+
+
+def index_quotes(quote_ids):
+    """(Re)index the given quotes (only SQLite keeps a separate index)"""
+    FTS.index(quote_ids)
+
+
+def unindex_quote(quote_id):
+    FTS.unindex(quote_id)
+
+
+def rebuild_index():
+    """Index every quote from scratch (the PostgreSQL indexes need no rebuild)"""
+    FTS.rebuild()
+
+
+def _trigram_search(queryset, terms, query):
+    from django.contrib.postgres.search import TrigramSimilarity
+
+    for term in terms:
+        pattern = like_pattern(term)
+        queryset = queryset.filter(
+            Q(client_id__in=Client.objects.extra(where=['full_name ILIKE %s'], params=[pattern]).values('id')) |
+            Q(product_id__in=Product.objects.extra(where=['name ILIKE %s'], params=[pattern]).values('id'))
+        )
+    # GREATEST skips the NULL similarity of quotes without a product
+    return queryset.annotate(
+        search_rank=Greatest(
+            TrigramSimilarity('client__full_name', query),
+            TrigramSimilarity('product__name', query),
+        )
+    ).order_by('-search_rank', '-created_at')
+
+
+def search_quotes(query, queryset=None):
+    """Return ``queryset`` narrowed to quotes matching ``query``, best match first"""
+    from .models import QuoteRequest
+
+    if queryset is None:
+        queryset = QuoteRequest.objects.all()
+
+    by_phone = phone_condition(query, 'client__phone_number')
+    if by_phone:
+        return queryset.filter(by_phone).annotate(
+            search_rank=Value(1.0, output_field=FloatField())
+        ).order_by('-created_at')
+
+    terms = search_terms(query)
+    if not terms:
+        return queryset.none()
+
+    backend = search_backend()
+    if backend == 'postgresql' and postgres_has_trgm():
+        return _trigram_search(queryset, terms, ' '.join(terms))
+
+    if backend == 'sqlite':
+        return queryset.filter(id__in=FTS.matching(terms)).annotate(
+            search_rank=FTS.rank(terms, 'quotes_quoterequest.id', [5.0, 1.0])
+        ).order_by('-search_rank', '-created_at')
+
+    # No indexed search on this database - plain substring match
+    condition = Q()
+    for term in terms:
+        condition &= Q(client__full_name__icontains=term) | Q(product__name__icontains=term)
+    return queryset.filter(condition).annotate(
+        search_rank=Value(0.0, output_field=FloatField())
+    ).order_by('-created_at')
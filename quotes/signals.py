@@ -0,0 +1,31 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from clients.models import Client
+from products.models import Product
+
+from .models import QuoteRequest
+from .search import index_quotes, unindex_quote
+
+
+@receiver(post_save, sender=QuoteRequest)
+def index_quote(sender, instance, raw=False, **kwargs):
+    """Keep the search index in step with the quote"""
+    if raw:
+        return
+    index_quotes([instance.pk])
+
+
+@receiver(post_delete, sender=QuoteRequest)
+def unindex_deleted_quote(sender, instance, **kwargs):
+    unindex_quote(instance.pk)
+
+
+@receiver(post_save, sender=Client)
+@receiver(post_save, sender=Product)
+def reindex_named_quotes(sender, instance, created, raw=False, **kwargs):
+    """Quotes are found by client and product name - follow renames"""
+    if raw or created:
+        return
+    field = 'client' if sender is Client else 'product'
+    index_quotes(QuoteRequest.objects.filter(**{field: instance}).values_list('id', flat=True))
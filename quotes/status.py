@@ -0,0 +1,107 @@
+"""
+Quote status changes and their audit trail.
+
+Every change writes a ``QuoteStatusChange`` row saying who moved the quote
+from which status to which. ``bulk_transition`` moves any number of quotes
+with one locking read, one ``UPDATE ... WHERE id IN (...)`` and one
+``bulk_create`` of audit rows, however many are selected.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from core import funnel
+from core.cache import ANALYTICS, bump_version_on_commit
+
+from .models import QuoteRequest, QuoteStatusChange
+
+
+# Where a bulk action may move each status. The quote page can still set
+# any status by hand.
+TRANSITIONS = {
+    'pending': ('reviewed', 'quoted', 'declined'),
+    'reviewed': ('quoted', 'declined'),
+    'quoted': ('accepted', 'declined'),
+    'accepted': (),
+    'declined': ('pending',),
+}
+
+
+def sources_for(to_status):
+    """Statuses a bulk action may move to ``to_status``"""
+    return [status for status, targets in TRANSITIONS.items() if to_status in targets]
+
+
+def log_changes(changes, to_status, user=None, changed_at=None):
+    """Audit rows for ``changes``, a list of (quote id, previous status)"""
+    changed_at = changed_at or timezone.now()
+    if user is not None and not user.is_authenticated:
+        user = None
+    # Before the rows below exist, so first arrivals can be told apart
+    funnel.record([quote_id for quote_id, _ in changes], to_status, changed_at)
+    QuoteStatusChange.objects.bulk_create([
+        QuoteStatusChange(
+            quote_id=quote_id,
+            from_status=from_status,
+            to_status=to_status,
+            changed_by=user,
+            changed_at=changed_at,
+        )
+        for quote_id, from_status in changes
+    ], batch_size=500)
+
+
+def set_status(quote, to_status, user=None):
+    """Change one quote's status by hand. Returns False if it already had it."""
+    from_status = quote.status
+    if from_status == to_status:
+        return False
+    with transaction.atomic():
+        quote.status = to_status
+        quote.save(update_fields=['status', 'updated_at'])
+        log_changes([(quote.pk, from_status)], to_status, user, quote.updated_at)
+    return True
+
+
+def bulk_transition(quotes, to_status, user=None):
+    """
+    Move the quotes in the ``quotes`` queryset to ``to_status`` where
+    ``TRANSITIONS`` allows it. Returns (number moved, number left alone).
+    """
+    allowed_from = sources_for(to_status)
+    with transaction.atomic():
+        # Locked, so nothing changes status between this read and the UPDATE
+        current = list(
+            QuoteRequest.objects.select_for_update()
+            .filter(pk__in=quotes.values('pk'))
+            .values_list('id', 'status')
+        )
+        changes = [(quote_id, status) for quote_id, status in current if status in allowed_from]
+        if changes:
+            now = timezone.now()
+            # update() skips auto_now and signals: stamp updated_at for the
+            # live dashboard and retire the cached status analytics
+            QuoteRequest.objects.filter(pk__in=[quote_id for quote_id, _ in changes]).update(
+                status=to_status, updated_at=now
+            )
+            log_changes(changes, to_status, user, now)
+            bump_version_on_commit(ANALYTICS)
+    return len(changes), len(current) - len(changes)
+
+
+def backfill_history(QuoteRequest, QuoteStatusChange):
+    """
+    One change, dated at the quote's last update, for every quote that left
+    pending before changes were logged. Models are passed in so migrations
+    can use their historical versions. Returns the number of rows written.
+    """
+    unlogged = (
+        QuoteRequest.objects.exclude(status='pending')
+        .filter(status_changes__isnull=True)
+        .values_list('id', 'status', 'updated_at')
+    )
+    rows = [
+        QuoteStatusChange(quote_id=quote_id, from_status='pending', to_status=status, changed_at=updated_at)
+        for quote_id, status, updated_at in unlogged.iterator(chunk_size=2000)
+    ]
+    QuoteStatusChange.objects.bulk_create(rows, batch_size=500)
+    return len(rows)
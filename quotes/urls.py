@@ -6,4 +6,5 @@ app_name = 'quotes'
 urlpatterns = [
     path('existing/<slug:product_slug>/', views.existing_product_quote, name='existing_product'),
     path('custom/', views.custom_project_quote, name='custom_project'),
+    path('basket/', views.quote_basket, name='basket'),
 ]
\ No newline at end of file
@@ -1,10 +1,43 @@
-from django.shortcuts import render, get_object_or_404, redirect
+from django.shortcuts import render, get_object_or_404, redirect, resolve_url
 from django.contrib import messages
-from django.db import transaction
+from django.db import DatabaseError, transaction
+from core import idempotency, stats
 from products.models import Product
-from clients.models import Client
-from .models import QuoteRequest, Measurements
-from .forms import ExistingProductQuoteForm, CustomProjectQuoteForm, MeasurementsForm
+from clients.identity import remember_client, returning_client, upsert_client
+from . import measurements as saved_measurements
+from .models import QuoteRequest, Measurements, ReferenceImageJob
+from .notifications import queue_quote_notifications
+from .references import discard_staged, stage_upload
+from .search import index_quotes
+from .forms import (
+    ExistingProductQuoteForm, CustomProjectQuoteForm, MeasurementsForm,
+    QuoteBasketForm, QuoteBasketItemFormSet,
+)
+
+
+def _returning_client_initial(request):
+    """Details this device entered last time, so returning clients type less"""
+    client = returning_client(request)
+    if client is None:
+        return {}, {}
+    client_initial = {
+        'full_name': client.full_name,
+        'phone_number': client.phone_number,
+        'email': client.email or '',
+    }
+    latest = saved_measurements.latest_for_client(client.pk)
+    measurements_initial = {}
+    if latest:
+        measurements_initial = {name: getattr(latest, name) for name in Measurements.VALUE_FIELDS}
+    return client_initial, measurements_initial
+
+
+def _measurements_for(client, measurements_form):
+    """The saved row the client chose, or a matching/new row for what they entered"""
+    if measurements_form.saved:
+        saved_measurements.use(measurements_form.saved)
+        return measurements_form.saved
+    return saved_measurements.record(client, [measurements_form.measurement_values()])[0]
 
 
 def existing_product_quote(request, product_slug):
@@ -12,23 +45,32 @@ def existing_product_quote(request, product_slug):
     product = get_object_or_404(Product, slug=product_slug)
     
     if request.method == 'POST':
+        # A retried submission gets the original answer without writing again
+        replayed = idempotency.replayed_redirect(request)
+        if replayed:
+            return idempotency.replay_response(request, replayed)
+        
         quote_form = ExistingProductQuoteForm(request.POST)
         measurements_form = MeasurementsForm(request.POST)
         
-        if quote_form.is_valid() and measurements_form.is_valid():
+        if (quote_form.is_valid() and measurements_form.is_valid()
+                and measurements_form.resolve_saved(
+                    quote_form.cleaned_data['phone_number'], returning_client(request))):
+            success_url = resolve_url('products:detail', slug=product.slug)
             try:
                 with transaction.atomic():
-                    # Create or get client
-                    client, created = Client.objects.get_or_create(
-                        phone_number=quote_form.cleaned_data['phone_number'],
-                        defaults={
-                            'full_name': quote_form.cleaned_data['full_name'],
-                            'email': quote_form.cleaned_data['email'],
-                        }
+                    # Claimed first, so a racing copy of this POST stops here
+                    idempotency.record(request, success_url)
+                    
+                    # One client per normalized number, safe under concurrent submits
+                    client = upsert_client(
+                        quote_form.cleaned_data['phone_number'],
+                        quote_form.cleaned_data['full_name'],
+                        quote_form.cleaned_data['email'],
                     )
                     
-                    # Create measurements
-                    measurements = measurements_form.save()
+                    # Reuse the client's saved row when nothing changed
+                    measurements = _measurements_for(client, measurements_form)
                     
                     # Create quote request
                     quote_request = QuoteRequest.objects.create(
@@ -40,23 +82,29 @@ def existing_product_quote(request, product_slug):
                         measurements=measurements
                     )
                     
+                    queue_quote_notifications(client, [quote_request])
+                    
                     messages.success(
                         request, 
                         f'Your quote request for {product.name} has been submitted successfully! '
                         f'We will contact you at {client.phone_number} soon.'
                     )
-                    return redirect('products:detail', slug=product.slug)
+                    return remember_client(redirect(success_url), client)
                     
+            except idempotency.Replayed as replay:
+                return idempotency.replay_response(request, replay.redirect_to)
             except Exception as e:
                 messages.error(request, 'There was an error submitting your quote. Please try again.')
     else:
-        quote_form = ExistingProductQuoteForm()
-        measurements_form = MeasurementsForm()
+        client_initial, measurements_initial = _returning_client_initial(request)
+        quote_form = ExistingProductQuoteForm(initial=client_initial)
+        measurements_form = MeasurementsForm(initial=measurements_initial)
     
     context = {
         'product': product,
         'quote_form': quote_form,
         'measurements_form': measurements_form,
+        'idempotency_key': idempotency.form_key(request),
     }
     return render(request, 'quotes/existing_product_quote.html', context)
 
@@ -64,23 +112,39 @@ def existing_product_quote(request, product_slug):
 def custom_project_quote(request):
     """Quote request for custom project"""
     if request.method == 'POST':
+        # A retried submission gets the original answer without writing again
+        replayed = idempotency.replayed_redirect(request)
+        if replayed:
+            return idempotency.replay_response(request, replayed)
+        
         quote_form = CustomProjectQuoteForm(request.POST, request.FILES)
         measurements_form = MeasurementsForm(request.POST)
         
-        if quote_form.is_valid() and measurements_form.is_valid():
+        if (quote_form.is_valid() and measurements_form.is_valid()
+                and measurements_form.resolve_saved(
+                    quote_form.cleaned_data['phone_number'], returning_client(request))):
+            staged_file = None
+            success_url = resolve_url('core:home')
             try:
+                # Stream the upload to staging outside the transaction; the
+                # background worker validates and re-encodes it
+                upload = quote_form.cleaned_data['reference_image']
+                if upload:
+                    staged_file = stage_upload(upload)
+                
                 with transaction.atomic():
-                    # Create or get client
-                    client, created = Client.objects.get_or_create(
-                        phone_number=quote_form.cleaned_data['phone_number'],
-                        defaults={
-                            'full_name': quote_form.cleaned_data['full_name'],
-                            'email': quote_form.cleaned_data['email'],
-                        }
+                    # Claimed first, so a racing copy of this POST stops here
+                    idempotency.record(request, success_url)
+                    
+                    # One client per normalized number, safe under concurrent submits
+                    client = upsert_client(
+                        quote_form.cleaned_data['phone_number'],
+                        quote_form.cleaned_data['full_name'],
+                        quote_form.cleaned_data['email'],
                     )
                     
-                    # Create measurements
-                    measurements = measurements_form.save()
+                    # Reuse the client's saved row when nothing changed
+                    measurements = _measurements_for(client, measurements_form)
                     
                     # Create quote request
                     quote_request = QuoteRequest.objects.create(
@@ -88,26 +152,128 @@ def custom_project_quote(request):
                         quote_type='custom',
                         custom_description=quote_form.cleaned_data['custom_description'],
                         fabric_preference=quote_form.cleaned_data['fabric_preference'],
-                        reference_image=quote_form.cleaned_data['reference_image'],
                         additional_notes=quote_form.cleaned_data['additional_notes'],
                         measurements=measurements
                     )
                     
+                    if staged_file:
+                        ReferenceImageJob.objects.create(
+                            quote=quote_request,
+                            staged_file=staged_file,
+                            original_size=upload.size,
+                        )
+                    
+                    queue_quote_notifications(client, [quote_request])
+                    
                     messages.success(
                         request, 
                         f'Your custom project quote request has been submitted successfully! '
                         f'We will contact you at {client.phone_number} soon.'
                     )
-                    return redirect('core:home')
+                    return remember_client(redirect(success_url), client)
                     
+            except idempotency.Replayed as replay:
+                discard_staged(staged_file)
+                return idempotency.replay_response(request, replay.redirect_to)
             except Exception as e:
+                discard_staged(staged_file)
                 messages.error(request, 'There was an error submitting your quote. Please try again.')
     else:
-        quote_form = CustomProjectQuoteForm()
-        measurements_form = MeasurementsForm()
+        client_initial, measurements_initial = _returning_client_initial(request)
+        quote_form = CustomProjectQuoteForm(initial=client_initial)
+        measurements_form = MeasurementsForm(initial=measurements_initial)
     
     context = {
         'quote_form': quote_form,
         'measurements_form': measurements_form,
+        'idempotency_key': idempotency.form_key(request),
+    }
+    return render(request, 'quotes/custom_project_quote.html', context)
+
+
+def quote_basket(request):
+    """Quote request for several existing products in one submission"""
+    if request.method == 'POST':
+        # A retried submission gets the original answer without writing again
+        replayed = idempotency.replayed_redirect(request)
+        if replayed:
+            return idempotency.replay_response(request, replayed)
+        
+        client_form = QuoteBasketForm(request.POST)
+        item_formset = QuoteBasketItemFormSet(request.POST, prefix='items')
+        
+        if client_form.is_valid() and item_formset.is_valid():
+            success_url = resolve_url('products:list')
+            try:
+                with transaction.atomic():
+                    # Claimed first, so a racing copy of this POST stops here
+                    idempotency.record(request, success_url)
+                    
+                    client = upsert_client(
+                        client_form.cleaned_data['phone_number'],
+                        client_form.cleaned_data['full_name'],
+                        client_form.cleaned_data['email'],
+                    )
+                    
+                    # One Measurements row per distinct set of values, reusing
+                    # the client's saved rows where they match
+                    entered = [
+                        item_form.measurement_values()
+                        for item_form in item_formset
+                        if not item_form.cleaned_data['same_measurements']
+                    ]
+                    rows = iter(saved_measurements.record(client, entered))
+                    item_measurements = []
+                    for item_form in item_formset:
+                        if item_form.cleaned_data['same_measurements']:
+                            item_measurements.append(item_measurements[0])
+                        else:
+                            item_measurements.append(next(rows))
+                    
+                    quote_requests = QuoteRequest.objects.bulk_create([
+                        QuoteRequest(
+                            client=client,
+                            quote_type='existing',
+                            product=item_form.cleaned_data['product'],
+                            fabric_preference=item_form.cleaned_data['fabric_preference'],
+                            additional_notes=item_form.cleaned_data['item_notes'],
+                            measurements=measurements,
+                        )
+                        for item_form, measurements in zip(item_formset, item_measurements)
+                    ])
+                    
+                    # bulk_create skips the signals that keep the dashboard rollup
+                    # and search index current
+                    stats.record(quotes=len(quote_requests))
+                    index_quotes([quote_request.pk for quote_request in quote_requests])
+                    
+                    queue_quote_notifications(client, quote_requests)
+                    
+                    count = len(quote_requests)
+                    messages.success(
+                        request,
+                        f'Your quote request for {count} garment{"s" if count != 1 else ""} has been submitted successfully! '
+                        f'We will contact you at {client.phone_number} soon.'
+                    )
+                    return remember_client(redirect(success_url), client)
+                    
+            except idempotency.Replayed as replay:
+                return idempotency.replay_response(request, replay.redirect_to)
+            except DatabaseError:
+                messages.error(request, 'There was an error submitting your quote. Please try again.')
+    else:
+        client_initial, measurements_initial = _returning_client_initial(request)
+        client_form = QuoteBasketForm(initial=client_initial)
+        first_item = dict(measurements_initial)
+        product_slug = request.GET.get('product')
+        if product_slug:
+            first_item['product'] = product_slug
+        item_formset = QuoteBasketItemFormSet(prefix='items', initial=[first_item] if first_item else [])
+    
+    context = {
+        'client_form': client_form,
+        'item_formset': item_formset,
+        'measurement_fields': Measurements.VALUE_FIELDS,
+        'idempotency_key': idempotency.form_key(request),
     }
-    return render(request, 'quotes/custom_project_quote.html', context)
\ No newline at end of file
+    return render(request, 'quotes/quote_basket.html', context)
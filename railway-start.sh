@@ -52,10 +52,25 @@ else:
 echo "📦 Loading sample data..."
 python manage.py setup_sample_data
 
+# Forget form resubmission keys past their TTL (drain_outbox keeps doing so hourly)
+python manage.py purge_idempotency_keys
+
 # Collect static files
 echo "🎨 Collecting static files..."
 python manage.py collectstatic --noinput --clear
 
+# Reference images uploaded with quotes are processed off the web workers
+echo "🖼️ Starting reference image worker..."
+python manage.py process_reference_images &
+
+# Notification emails are queued by the web workers and sent from here
+echo "✉️ Starting outbox worker..."
+python manage.py drain_outbox &
+
+# Related-product lists are re-scored here after product saves
+echo "🔗 Starting related products worker..."
+python manage.py build_related_products --watch &
+
 echo "🎉 Setup complete! Starting server..."
 
 # Start the server
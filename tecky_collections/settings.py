@@ -145,13 +145,78 @@ STATICFILES_DIRS = [
 # WhiteNoise configuration for static files
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
+# Pre-rendered public pages (python manage.py export_static_site)
+STATIC_EXPORT_ROOT = Path(config('STATIC_EXPORT_ROOT', default=str(BASE_DIR / 'static_site')))
+
+# Let WhiteNoise answer exported pages without touching Django. WhiteNoise
+# indexes the directory at startup, so restart after each export. Requests
+# with a query string or a pending flash message still reach the views
+# (core.middleware), which can only see messages kept in the cookie.
+if config('SERVE_STATIC_EXPORT', default=False, cast=bool):
+    WHITENOISE_ROOT = STATIC_EXPORT_ROOT
+    WHITENOISE_INDEX_FILE = True
+    MIDDLEWARE[MIDDLEWARE.index('whitenoise.middleware.WhiteNoiseMiddleware')] = (
+        'core.middleware.StaticExportMiddleware'
+    )
+    MESSAGE_STORAGE = 'django.contrib.messages.storage.cookie.CookieStorage'
+
 # Media files
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Email - notifications are queued in core.outbox and sent by `manage.py drain_outbox`.
+# For local testing point EMAIL_HOST/EMAIL_PORT at an SMTP stand-in, e.g.
+# `python -m aiosmtpd -n -l localhost:1025`.
+EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.smtp.EmailBackend')
+EMAIL_HOST = config('EMAIL_HOST', default='localhost')
+EMAIL_PORT = config('EMAIL_PORT', default=25, cast=int)
+EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
+EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
+EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=False, cast=bool)
+EMAIL_TIMEOUT = config('EMAIL_TIMEOUT', default=30, cast=int)
+DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='Tecky Collections <teckycollections@gmail.com>')
+# Who hears about new quote requests and contact messages
+NOTIFICATION_EMAILS = config('NOTIFICATION_EMAILS', default='teckycollections@gmail.com').split(',')
+
+# Phone numbers without a country code are taken to be Kenyan (clients.phone)
+DEFAULT_PHONE_COUNTRY_CODE = config('DEFAULT_PHONE_COUNTRY_CODE', default='254')
+
+# Quote reference images are staged as uploaded and re-encoded by
+# `manage.py process_reference_images` (see quotes/references.py)
+QUOTE_REFERENCE_MAX_UPLOAD_MB = config('QUOTE_REFERENCE_MAX_UPLOAD_MB', default=15, cast=int)
+QUOTE_REFERENCE_MAX_DIMENSION = config('QUOTE_REFERENCE_MAX_DIMENSION', default=2048, cast=int)
+
+# How long a retried quote/contact POST is recognised as a replay (core/idempotency.py)
+IDEMPOTENCY_KEY_TTL_HOURS = config('IDEMPOTENCY_KEY_TTL_HOURS', default=24, cast=int)
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Cache configuration
+# The local-memory default is per gunicorn worker; point CACHE_BACKEND at a
+# shared backend (e.g. django.core.cache.backends.db.DatabaseCache) to share
+# cached pages and counters between workers.
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='tecky-collections'),
+    }
+}
+
+# Rendered catalog pages are invalidated by version bump, the timeout only bounds memory
+CATALOG_PAGE_CACHE_TIMEOUT = config('CATALOG_PAGE_CACHE_TIMEOUT', default=60 * 60 * 24, cast=int)
+
+# Dashboard analytics are invalidated on writes too; the timeout is a backstop
+ANALYTICS_CACHE_TIMEOUT = config('ANALYTICS_CACHE_TIMEOUT', default=60 * 15, cast=int)
+
+# Seconds between change-feed queries for each live dashboard stream (core/live.py)
+LIVE_DASHBOARD_POLL_SECONDS = config('LIVE_DASHBOARD_POLL_SECONDS', default=3, cast=int)
+
+# Dashboard list counts (core/pagination.py): unfiltered tables past the threshold use
+# PostgreSQL's row estimate; other counts are cached for the timeout
+DASHBOARD_COUNT_ESTIMATE_THRESHOLD = config('DASHBOARD_COUNT_ESTIMATE_THRESHOLD', default=50000, cast=int)
+DASHBOARD_COUNT_CACHE_TIMEOUT = config('DASHBOARD_COUNT_CACHE_TIMEOUT', default=60, cast=int)
+
 # Login URLs
 LOGIN_URL = '/dashboard/login/'
 LOGIN_REDIRECT_URL = '/dashboard/'